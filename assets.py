@@ -0,0 +1,151 @@
+import pygame as pg
+import numpy as np
+
+import struct
+import json
+import os
+
+_frame_sets   = []
+_frame_ids    = {}
+_frame_keys   = {}
+_frame_counts = np.zeros(0, dtype=np.int64)
+
+CACHE_MAGIC  = b'FBAST001'
+CACHE_HEADER = struct.Struct('<8sQ')
+
+def slice_frames(spritesheet, size, n_row, n_col):
+    _w = spritesheet.get_width() // n_col
+    _h = spritesheet.get_height() // n_row
+
+    sprites = []
+    for row in range(n_row):
+        for col in range(n_col):
+            surf = pg.Surface((_w, _h), pg.SRCALPHA)
+            surf.blit(spritesheet, (0, 0), (col * _w, row * _h, _w, _h))
+            surf = pg.transform.scale(surf, size)
+            sprites.append(surf)
+
+    return tuple(sprites)
+
+def intern_frames(spritesheet, size, n_row, n_col):
+    global _frame_counts
+
+    key = spritesheet, tuple(size), n_row, n_col
+    if key not in _frame_ids:
+        _frame_ids[key] = len(_frame_sets)
+        _frame_sets.append(slice_frames(spritesheet, size, n_row, n_col))
+        _frame_keys.update({ id(frame): (_frame_ids[key], i) for i, frame in enumerate(_frame_sets[-1]) })
+        _frame_counts   = np.array([len(frames) for frames in _frame_sets], dtype=np.int64)
+
+    return _frame_ids[key]
+
+def frame_set(frames):
+    return _frame_sets[frames]
+
+def frame_key(surface):
+    return _frame_keys.get(id(surface))
+
+def frame_counts():
+    return _frame_counts
+
+class AssetManager(object):
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self.surfaces   = {}
+        self.keys       = {}
+        self._decoded   = {}
+        self._index     = {}
+        self._pending   = {}
+
+        if cache_path is not None and os.path.exists(cache_path):
+            self._index = self._read_index()
+
+    def _read_index(self):
+        with open(self.cache_path, 'rb') as f:
+            magic, length = CACHE_HEADER.unpack(f.read(CACHE_HEADER.size))
+            if magic != CACHE_MAGIC: return {}
+            entries = json.loads(f.read(length))
+
+        start, index = CACHE_HEADER.size + length, {}
+        for path, size, alpha, stamp, surface_size, fmt, offset, nbytes in entries:
+            index[path, tuple(size) if size is not None else None, alpha] = tuple(stamp), tuple(surface_size), fmt, start + offset, nbytes
+        return index
+
+    def _read_pixels(self, offset, nbytes):
+        with open(self.cache_path, 'rb') as f:
+            f.seek(offset)
+            return f.read(nbytes)
+
+    def _convert(self, surface, alpha):
+        if pg.display.get_surface() is None: return surface
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    def _stamp(self, path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _decode(self, path, alpha):
+        key = path, alpha
+        if key not in self._decoded:
+            self._decoded[key] = self._convert(pg.image.load(path), alpha)
+        return self._decoded[key]
+
+    def _from_disk(self, key, path):
+        entry = self._index.get(key)
+        if entry is None or entry[0] != self._stamp(path): return None
+
+        stamp, size, fmt, offset, nbytes = entry
+        return pg.image.frombytes(self._read_pixels(offset, nbytes), size, fmt)
+
+    def _to_disk(self, key, path, surface, alpha):
+        fmt                = 'RGBA' if alpha else 'RGB'
+        self._pending[key] = self._stamp(path), surface.get_size(), fmt, pg.image.tobytes(surface, fmt)
+
+    def load(self, path, size=None, alpha=True):
+        key = path, tuple(size) if size is not None else None, alpha
+        if key in self.surfaces: return self.surfaces[key]
+
+        surface = self._from_disk(key, path) if self.cache_path is not None else None
+        if surface is not None:
+            surface = self._convert(surface, alpha)
+        else:
+            surface = self._decode(path, alpha)
+            if size is not None and surface.get_size() != key[1]:
+                surface = pg.transform.scale(surface, key[1])
+            if self.cache_path is not None:
+                self._to_disk(key, path, surface, alpha)
+
+        self.surfaces[key]     = surface
+        self.keys[id(surface)] = key
+        return surface
+
+    def key_of(self, surface):
+        return self.keys.get(id(surface))
+
+    def get(self, key):
+        return self.load(*key)
+
+    def release_decoded(self):
+        self._decoded.clear()
+
+    def save(self):
+        if self.cache_path is None or not self._pending: return
+
+        entries = dict(self._pending)
+        for key, (stamp, size, fmt, offset, nbytes) in self._index.items():
+            if key not in entries: entries[key] = stamp, size, fmt, self._read_pixels(offset, nbytes)
+
+        index, offset = [], 0
+        for (path, size, alpha), (stamp, surface_size, fmt, pixels) in entries.items():
+            index.append([path, size, alpha, stamp, surface_size, fmt, offset, len(pixels)])
+            offset += len(pixels)
+
+        header = json.dumps(index).encode()
+        with open(self.cache_path, 'wb') as f:
+            f.write(CACHE_HEADER.pack(CACHE_MAGIC, len(header)))
+            f.write(header)
+            for stamp, size, fmt, pixels in entries.values():
+                f.write(pixels)
+
+        self._pending = {}
+        self._index   = self._read_index()
@@ -0,0 +1,69 @@
+from maths import Vector2DArray
+from maths import Vector2D
+
+import time
+
+def operators(entities, dt):
+    for entity in entities:
+        pos, vel, acc = entity
+
+        last_vel  = Vector2D(vel.x, vel.y)
+        vel      += acc * dt
+        pos      += 0.5 * (last_vel + vel) * dt
+        entity[2] = Vector2D()
+
+def in_place(entities, dt):
+    for pos, vel, acc in entities:
+        last_x, last_y = vel.x, vel.y
+
+        vel.add_scaled(acc, dt)
+        pos.x += 0.5 * (last_x + vel.x) * dt
+        pos.y += 0.5 * (last_y + vel.y) * dt
+
+        acc.set(0, 0)
+
+def array(arrays, dt):
+    pos, vel, acc = arrays
+
+    last_vel = vel.copy()
+    vel.add_scaled(acc, dt)
+    pos.add_scaled(last_vel.add_scaled(vel, 1), 0.5 * dt)
+    acc.set(0, 0)
+
+def count_allocations(update, setup, dt):
+    data  = setup()
+    count = [0]
+    init  = Vector2D.__init__
+
+    def counting_init(self, x=0, y=0):
+        count[0] += 1
+        init(self, x, y)
+
+    Vector2D.__init__ = counting_init
+    try:
+        update(data, dt)
+    finally:
+        Vector2D.__init__ = init
+    return count[0]
+
+def measure(update, setup, dt, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        data  = setup()
+        start = time.perf_counter()
+        update(data, dt)
+        best  = min(best, time.perf_counter() - start)
+    return best
+
+def main(n=100_000, repeat=5, dt=1 / 60):
+    entities = lambda: [[Vector2D(0, 0), Vector2D(1, 0), Vector2D(0, -900)] for _ in range(n)]
+    arrays   = lambda: (Vector2DArray(n=n), Vector2DArray(n=n).set(1, 0), Vector2DArray(n=n).set(0, -900))
+
+    print(f'{"mode":<10} {"ns / entity":>12} {"Vector2D / entity":>18}')
+    for name, update, setup in (('operators', operators, entities), ('in_place', in_place, entities), ('array', array, arrays)):
+        elapsed     = measure(update, setup, dt, repeat)
+        allocations = count_allocations(update, setup, dt)
+        print(f'{name:<10} {elapsed / n * 1e9:>12.1f} {allocations / n:>18.2f}')
+
+if __name__ == '__main__':
+    main()
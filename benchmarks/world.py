@@ -0,0 +1,253 @@
+from components import RectangleColliderComponent
+from components import ObstacleTagComponent
+from components import ScrollableComponent
+from components import TransformComponent
+from components import RigidBodyComponent
+from components import PlayerTagComponent
+from components import FlapComponent
+
+from systems import ScrollableSystem
+from systems import CollisionSystem
+from systems import MovementSystem
+from systems import GravitySystem
+
+from ecs import World
+
+import numpy as np
+import argparse
+import platform
+import json
+import time
+import gc
+
+QUERY_TYPES = (TransformComponent, RigidBodyComponent, ScrollableComponent, FlapComponent)
+SIZES       = (1_000, 10_000, 100_000, 1_000_000)
+MODES       = ('object', 'columnar')
+
+class HeadlessWindow(object):
+    def __init__(self, h):
+        self.h = h
+
+    def get_height(self):
+        return self.h
+
+def make_world(mode):
+    return World(columnar=mode == 'columnar')
+
+def measure(setup, run, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        state = setup()
+
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(state)
+            best  = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+def bench_create(mode, n, repeat):
+    def run(world):
+        for i in range(n):
+            world.create_entity(TransformComponent(i, 0), RigidBodyComponent())
+
+    return measure(lambda: make_world(mode), run, repeat), n
+
+def bench_create_many(mode, n, repeat):
+    def run(world):
+        world.create_entities(n, [TransformComponent(i, 0) for i in range(n)], RigidBodyComponent())
+
+    return measure(lambda: make_world(mode), run, repeat), n
+
+def bench_delete(mode, n, repeat):
+    def setup():
+        world = make_world(mode)
+        ents  = [world.create_entity(TransformComponent(i, 0), RigidBodyComponent()) for i in range(n)]
+        return world, ents
+
+    def run(state):
+        world, ents = state
+        for ent in ents:
+            world.delete_entity(ent)
+        world.update()
+
+    return measure(setup, run, repeat), n
+
+def bench_recycle(mode, n, repeat):
+    def setup():
+        world = make_world(mode)
+        ents  = [world.create_entity(TransformComponent(i, 0), RigidBodyComponent()) for i in range(n)]
+        return world, ents
+
+    def run(state):
+        world, ents = state
+        for i, ent in enumerate(ents):
+            world.delete_entity(ent, immediate=True)
+            ents[i] = world.create_entity(TransformComponent(i, 0), RigidBodyComponent())
+
+    return measure(setup, run, repeat), n
+
+def bench_churn(mode, n, repeat):
+    def setup():
+        world = make_world(mode)
+        ents  = [world.create_entity(TransformComponent(i, 0)) for i in range(n)]
+        world.get_components(TransformComponent, RigidBodyComponent)
+        return world, ents
+
+    def run(state):
+        world, ents = state
+        for ent in ents:
+            world.add_component(ent, RigidBodyComponent())
+        world.get_components(TransformComponent, RigidBodyComponent)
+
+        for ent in ents:
+            world.remove_component(ent, RigidBodyComponent)
+        world.get_components(TransformComponent, RigidBodyComponent)
+
+    return measure(setup, run, repeat), 2 * n
+
+def bench_query(mode, n, repeat, n_types, cold):
+    types = QUERY_TYPES[:n_types]
+    world = make_world(mode)
+    for i in range(n):
+        world.create_entity(TransformComponent(i, 0), RigidBodyComponent(), ScrollableComponent(-150, 0), FlapComponent(400))
+
+    def setup():
+        if cold: world.clear_cache()
+        else:    world.get_components(*types)
+        return world
+
+    def run(world):
+        for ent, components in world.get_components(*types):
+            pass
+
+    return measure(setup, run, repeat), n
+
+def bench_compiled_query(mode, n, repeat, n_types):
+    types = QUERY_TYPES[:n_types]
+    world = make_world(mode)
+    for i in range(n):
+        world.create_entity(TransformComponent(i, 0), RigidBodyComponent(), ScrollableComponent(-150, 0), FlapComponent(400))
+
+    def run(world):
+        for ent, components in world.query(with_=types):
+            pass
+
+    world.query(with_=types)
+    return measure(lambda: world, run, repeat), n
+
+def physics_world(mode, n, h=980):
+    world = make_world(mode)
+    world.add_system(GravitySystem(force=-900), priority=8)
+    world.add_system(MovementSystem(), priority=6)
+    world.add_system(ScrollableSystem(), priority=4)
+    world.add_system(CollisionSystem(HeadlessWindow(h)), priority=3)
+
+    rng        = np.random.default_rng(0)
+    pos        = rng.uniform(0, 100 * np.sqrt(n), size=(n, 2)).tolist()
+    n_bodies   = n // 2
+    n_collider = max(1, n // 100)
+
+    for i, (x, y) in enumerate(pos[:n_bodies]):
+        components = [TransformComponent(x, y), RigidBodyComponent()]
+        if i < n_collider: components += [RectangleColliderComponent(x=0, y=0, w=10, h=10), PlayerTagComponent()]
+        world.create_entity(*components)
+
+    for i, (x, y) in enumerate(pos[n_bodies:]):
+        components = [TransformComponent(x, y), ScrollableComponent(-150, 0)]
+        if i < n_collider: components += [RectangleColliderComponent(x=0, y=0, w=10, h=10), ObstacleTagComponent()]
+        world.create_entity(*components)
+
+    world.update(dt=1 / 60)
+    return world
+
+def bench_frame(mode, n, repeat):
+    world = physics_world(mode, n)
+    return measure(lambda: world, lambda world: world.update(dt=1 / 60), repeat), n
+
+def cases(sizes, ops_n):
+    for mode in MODES:
+        yield 'create_entity', mode, ops_n, lambda mode, n, repeat: bench_create(mode, n, repeat)
+        yield 'create_entities', mode, ops_n, lambda mode, n, repeat: bench_create_many(mode, n, repeat)
+        yield 'delete_entity', mode, ops_n, lambda mode, n, repeat: bench_delete(mode, n, repeat)
+        yield 'entity_recycle', mode, ops_n, lambda mode, n, repeat: bench_recycle(mode, n, repeat)
+        yield 'component_churn', mode, ops_n, lambda mode, n, repeat: bench_churn(mode, n, repeat)
+
+        for n_types in range(1, len(QUERY_TYPES) + 1):
+            yield f'get_components_{n_types}_cold', mode, ops_n, lambda mode, n, repeat, k=n_types: bench_query(mode, n, repeat, k, True)
+            yield f'get_components_{n_types}_warm', mode, ops_n, lambda mode, n, repeat, k=n_types: bench_query(mode, n, repeat, k, False)
+            yield f'query_{n_types}', mode, ops_n, lambda mode, n, repeat, k=n_types: bench_compiled_query(mode, n, repeat, k)
+
+        for n in sizes:
+            yield 'physics_frame', mode, n, lambda mode, n, repeat: bench_frame(mode, n, repeat)
+
+def key(result):
+    return result['name'], result['mode'], result['n']
+
+def run(args):
+    results = []
+    for name, mode, n, bench in cases(args.sizes, args.ops_n):
+        seconds, ops = bench(mode, n, args.repeat)
+        results.append({ 'name': name, 'mode': mode, 'n': n, 'seconds': seconds, 'ns_per_op': seconds / ops * 1e9 })
+        print(f'{name:<26} {mode:<9} {n:>9,} {seconds * 1000:>10.2f} ms {seconds / ops * 1e9:>10.1f} ns/op', flush=True)
+
+    report = {
+        'meta': {
+            'python':   platform.python_version(),
+            'numpy':    np.__version__,
+            'machine':  platform.machine(),
+            'repeat':   args.repeat,
+            'time':     time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'results': results
+    }
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+def compare(args):
+    with open(args.baseline) as f: baseline = { key(result): result for result in json.load(f)['results'] }
+    with open(args.current) as f:  current  = { key(result): result for result in json.load(f)['results'] }
+
+    regressions = 0
+    for k in sorted(baseline.keys() & current.keys(), key=str):
+        ratio = current[k]['seconds'] / baseline[k]['seconds']
+        flag  = ''
+        if   ratio > 1 + args.threshold: flag, regressions = 'REGRESSION', regressions + 1
+        elif ratio < 1 - args.threshold: flag              = 'improved'
+
+        name, mode, n = k
+        print(f'{name:<26} {mode:<9} {n:>9,} {baseline[k]["ns_per_op"]:>10.1f} -> {current[k]["ns_per_op"]:>10.1f} ns/op {ratio:>6.2f}x {flag}')
+
+    for k in sorted(baseline.keys() ^ current.keys(), key=str):
+        print(f'{" ".join(map(str, k))} only in {"baseline" if k in baseline else "current"}')
+
+    print(f'{regressions} regression(s) above {args.threshold:.0%}')
+    return 1 if regressions else 0
+
+def main():
+    parser   = argparse.ArgumentParser(prog='python -m benchmarks.world')
+    commands = parser.add_subparsers(dest='command')
+
+    run_parser = commands.add_parser('run')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    run_parser.add_argument('--ops-n', type=int, default=10_000)
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--output', '-o', default=None, metavar='PATH')
+
+    compare_parser = commands.add_parser('compare')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+
+    args = parser.parse_args()
+    if args.command == 'compare': raise SystemExit(compare(args))
+    if args.command is None:      args = run_parser.parse_args([])
+    run(args)
+
+if __name__ == '__main__':
+    main()
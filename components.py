@@ -1,52 +1,60 @@
-import pygame as pg
-
 from maths import Vector2D
 
 class TransformComponent(object):
+    columns = (('pos', 2), ('rot', 1))
+
     def __init__(self, x, y, rot=None):
         self.pos = Vector2D(x, y)
         self.rot = rot
 
 class RigidBodyComponent(object):
+    columns = (('vel', 2), ('acc', 2))
+
     def __init__(self, vel_x=0, vel_y=0, acc_x=0, acc_y=0):
         self.vel = Vector2D(vel_x, vel_y)
         self.acc = Vector2D(acc_x, acc_y)
 
 class RenderableComponent(object):
     def __init__(self, sprite, x, y, size=None, depth=0):
-        self.sprite = sprite if size is None else pg.transform.scale(sprite, size)
+        if size is not None and sprite.get_size() != tuple(size):
+            import pygame as pg
+            sprite = pg.transform.scale(sprite, size)
+
+        self.sprite = sprite
         self.pos    = Vector2D(x, -y)
         self.depth  = depth
 
 class SpriteSheetSequenceComponent(object):
-    def __init__(self, spritesheet, size, n_row, n_col, duration):
-        self.duration    = duration
-        self.sprites     = []
-        self.clock       = 0
-        self.index       = 0
+    columns = (('duration', 1), ('clock', 1), ('index', 1, int), ('frames', 1, int))
 
-        self._set_sprites(spritesheet, n_col, n_row, size)
+    def __init__(self, spritesheet, size, n_row, n_col, duration):
+        from assets import intern_frames
 
-    def _set_sprites(self, spritesheet, n_col, n_row, size):
-        _w = spritesheet.get_width() // n_col
-        _h = spritesheet.get_height() // n_row
+        self.duration = duration
+        self.frames   = intern_frames(spritesheet, size, n_row, n_col)
+        self.clock    = 0
+        self.index    = 0
 
-        for row in range(n_row):
-            for col in range(n_col):
-                surf = pg.Surface((_w, _h), pg.SRCALPHA)
-                surf.blit(spritesheet, (0, 0), (col * _w, row * _h, _w, _h))
-                surf = pg.transform.scale(surf, size)
-                self.sprites.append(surf)
+    @property
+    def sprites(self):
+        from assets import frame_set
+        return frame_set(self.frames)
 
 class FlapComponent(object):
+    columns = (('force', 1),)
+
     def __init__(self, force=10):
         self.force = force
 
 class ScrollableComponent(object):
+    columns = (('speed', 2),)
+
     def __init__(self, speed_x=0, speed_y=0):
         self.speed = Vector2D(speed_x, speed_y)
 
 class ResetPositionComponent(object):
+    columns = (('pos', 2), ('thresh', 1))
+
     def __init__(self, x=0, y=0, thresh=0):
         self.pos    = Vector2D(x, y)
         self.thresh = thresh
@@ -70,10 +78,34 @@ class PipeTagComponent(object):
     def __init__(self):
         pass
 
+class PipeComponent(object):
+    columns = (('pair', 1, int), ('base', 1))
+
+    def __init__(self, pair=0, base=0):
+        self.pair = pair
+        self.base = base
+
+class PipeStreamComponent(object):
+    def __init__(self, pairs=1, spacing=778):
+        self.pairs   = pairs
+        self.spacing = spacing
+        self.offsets = []
+        self.cursor  = 0
+
 class PipeStateComponent(object):
+    columns = (('value', 1, bool),)
+
     def __init__(self):
         self.value = False
 
 class ScoreComponent(object):
+    columns = (('value', 1, int),)
+
     def __init__(self):
         self.value = 0
+
+class GameComponent(object):
+    columns = (('index', 1, int),)
+
+    def __init__(self, index=0):
+        self.index = index
@@ -1,99 +1,595 @@
-from functools import lru_cache as _lru_cache
+from scheduler import Scheduler
+from storage import ColumnStorage
+from profiler import Profiler
+from maths import Vector2D
+
+import itertools
+import threading
+import time
 
 class System:
-    world = None
+    world    = None
+    reads    = None
+    writes   = None
+    tracks   = ()
+    phase    = 'simulation'
+    last_run = -1
 
     def update(self, *args, **kwargs):
         raise NotImplementedError
 
-class World:
+class Query(object):
+    def __init__(self, component_types, single=False):
+        self.component_types = component_types
+        self.single          = single
+        self.rows            = {}
+        self._result         = None
+
+    def match(self, entity, components):
+        for component_type in self.component_types:
+            if component_type not in components:
+                self.discard(entity)
+                return
+
+        if self.single: row = entity, components[self.component_types[0]]
+        else:           row = entity, [components[ct] for ct in self.component_types]
+
+        self.rows[entity] = row
+        self._result      = None
+
+    def discard(self, entity):
+        if self.rows.pop(entity, None) is not None:
+            self._result = None
+
+    def result(self):
+        if self._result is None:
+            self._result = list(self.rows.values())
+        return self._result
+
+class CompiledQuery(object):
+    def __init__(self, world, include, exclude=(), optional=()):
+        self.world           = world
+        self.include         = include
+        self.exclude         = exclude
+        self.optional        = optional
+        self.component_types = include + exclude + optional
+        self.fetch           = include + optional
+        self.include_mask    = world.component_mask(include)
+        self.exclude_mask    = world.component_mask(exclude)
+        self.rows            = {}
+        self._result         = None
+
+    def matches(self, mask):
+        return mask & self.include_mask == self.include_mask and not mask & self.exclude_mask
+
+    def match(self, entity, components):
+        if not self.matches(self.world._entities.masks[entity & INDEX_MASK]):
+            self.discard(entity)
+            return
+
+        self.rows[entity] = entity, tuple(map(components.get, self.fetch))
+        self._result      = None
+
+    def discard(self, entity):
+        if self.rows.pop(entity, None) is not None:
+            self._result = None
+
+    def clear(self):
+        self.rows.clear()
+        self._result = None
+
+    def result(self):
+        if self._result is None:
+            self._result = list(self.rows.values())
+        return self._result
+
+    def entities(self):
+        return list(self.rows)
+
+    def __iter__(self):
+        return iter(self.result())
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, entity):
+        return entity in self.rows
+
+class ChangeLog(object):
+    def __init__(self, world, component_type):
+        self.world           = world
+        self.component_types = (component_type, )
+        self.present         = set()
+        self.added           = {}
+        self.changed         = {}
+        self.removed         = {}
+
+    @staticmethod
+    def _touch(log, entity, tick):
+        log.pop(entity, None)
+        log[entity] = tick
+
+    @staticmethod
+    def since(log, tick):
+        entities = []
+        for entity, changed in reversed(log.items()):
+            if changed <= tick: break
+            entities.append(entity)
+
+        entities.reverse()
+        return entities
+
+    def match(self, entity, components):
+        if self.component_types[0] not in components:
+            self.discard(entity)
+            return
+
+        tick = self.world.change_tick()
+        if entity not in self.present:
+            self.present.add(entity)
+            self.removed.pop(entity, None)
+            self._touch(self.added, entity, tick)
+        self._touch(self.changed, entity, tick)
+
+    def discard(self, entity):
+        if entity not in self.present: return
+
+        self.present.discard(entity)
+        self.added.pop(entity, None)
+        self.changed.pop(entity, None)
+        self._touch(self.removed, entity, self.world.change_tick())
+
+    def mark(self, entity, tick):
+        if entity in self.present: self._touch(self.changed, entity, tick)
+
+    def prune(self, horizon):
+        for log in (self.added, self.changed, self.removed):
+            while log:
+                entity = next(iter(log))
+                if log[entity] > horizon: break
+                del log[entity]
+
+    def clear(self):
+        self.present.clear()
+        self.added.clear()
+        self.changed.clear()
+        self.removed.clear()
+
+INDEX_BITS = 32
+INDEX_MASK = (1 << INDEX_BITS) - 1
+
+def entity_index(entity):
+    return entity & INDEX_MASK
+
+def entity_generation(entity):
+    return entity >> INDEX_BITS
+
+class StaleEntityError(KeyError):
+    def __init__(self, entity):
+        super().__init__(f'stale entity handle {entity} (index {entity_index(entity)}, generation {entity_generation(entity)})')
+        self.entity = entity
+
+class EntityTable(object):
     def __init__(self):
+        self.generations = [0]
+        self.components  = [None]
+        self.masks       = [0]
+        self.free        = []
+        self.count       = 0
+
+    def allocate(self):
+        self.count += 1
+
+        if self.free:
+            index                  = self.free.pop()
+            self.components[index] = {}
+            self.masks[index]      = 0
+            return self.generations[index] << INDEX_BITS | index
+
+        self.generations.append(0)
+        self.components.append({})
+        self.masks.append(0)
+        return len(self.generations) - 1
+
+    def allocate_many(self, count):
+        reused  = min(count, len(self.free))
+        handles = [self.allocate() for _ in range(reused)]
+
+        start, fresh = len(self.generations), count - reused
+        self.generations.extend([0] * fresh)
+        self.components.extend({} for _ in range(fresh))
+        self.masks.extend([0] * fresh)
+        self.count += fresh
+
+        handles.extend(range(start, start + fresh))
+        return handles
+
+    def _slot(self, entity):
+        index = entity & INDEX_MASK
+        if index < len(self.generations) and self.generations[index] == entity >> INDEX_BITS and self.components[index] is not None:
+            return index
+        raise StaleEntityError(entity)
+
+    def __contains__(self, entity):
+        return self.get(entity) is not None
+
+    def __getitem__(self, entity):
+        return self.components[self._slot(entity)]
+
+    def get(self, entity, default=None):
+        index = entity & INDEX_MASK
+        if index < len(self.generations) and self.generations[index] == entity >> INDEX_BITS:
+            components = self.components[index]
+            if components is not None: return components
+        return default
+
+    def __setitem__(self, entity, components):
+        self.components[self._slot(entity)] = components
+
+    def __delitem__(self, entity):
+        index = self._slot(entity)
+
+        self.components[index]   = None
+        self.masks[index]        = 0
+        self.generations[index] += 1
+        self.free.append(index)
+        self.count -= 1
+
+    def items(self):
+        generations = self.generations
+        for index, components in enumerate(self.components):
+            if components is not None:
+                yield generations[index] << INDEX_BITS | index, components
+
+    def __iter__(self):
+        return (entity for entity, components in self.items())
+
+    def __len__(self):
+        return self.count
+
+    def reset(self, generations, free):
+        self.generations = list(generations)
+        self.components  = [None] * len(self.generations)
+        self.masks       = [0] * len(self.generations)
+        self.free        = list(free)
+        self.count       = 0
+
+    def place(self, entity, components, mask=0):
+        index = entity & INDEX_MASK
+        if self.generations[index] != entity >> INDEX_BITS or self.components[index] is not None: raise StaleEntityError(entity)
+
+        self.components[index] = components
+        self.masks[index]      = mask
+        self.count            += 1
+
+    def clear(self):
+        self.reset([0], [])
+
+def clone_component(component_instance):
+    clone      = object.__new__(type(component_instance))
+    attributes = vars(clone)
+
+    for name, value in vars(component_instance).items():
+        if   isinstance(value, Vector2D): value = value.copy()
+        elif isinstance(value, list):     value = list(value)
+        attributes[name] = value
+    return clone
+
+class CommandBuffer(object):
+    def __init__(self, world):
+        self.world    = world
+        self.commands = []
+
+    def spawn(self, *components):
+        entity = self.world._entities.allocate()
+        self.commands.append(('spawn', entity, components))
+        return entity
+
+    def destroy(self, entity):
+        self.commands.append(('destroy', entity, None))
+
+    def add(self, entity, component_instance):
+        self.commands.append(('add', entity, component_instance))
+
+    def remove(self, entity, component_type):
+        self.commands.append(('remove', entity, component_type))
+
+    def take(self):
+        commands, self.commands = self.commands, []
+        return commands
+
+    def clear(self):
+        self.commands.clear()
+
+    def __len__(self):
+        return len(self.commands)
+
+class World:
+    def __init__(self, columnar=False, workers=1):
         self._systems        = []
-        self._next_entity_id = 0
         self._components     = {}
-        self._entities       = {}
+        self._entities       = EntityTable()
         self._dead_entities  = set()
+        self._storage        = ColumnStorage() if columnar else None
+        self._queries        = {}
+        self._type_queries   = {}
+        self._compiled       = {}
+        self._bits           = {}
+        self._observers      = []
+        self._owned          = {}
+        self._tracked        = set()
+        self._changes        = {}
+        self._ticks          = itertools.count(1)
+        self._tick           = 0
+        self._local          = threading.local()
+        self._scheduler      = Scheduler(workers, self._run_system)
+        self._profiler       = None
+        self.commands        = CommandBuffer(self)
 
     def clear_cache(self):
-        self.get_component.cache_clear()
-        self.get_components.cache_clear()
+        self._queries.clear()
+        self._type_queries.clear()
+
+        for observer in self._observers:
+            self._register(observer)
 
     def clear_database(self):
-        self._next_entity_id = 0
         self._dead_entities.clear()
+        self.commands.clear()
         self._components.clear()
         self._entities.clear()
+        if self._storage is not None: self._storage.clear()
+        for observer in self._observers: observer.clear()
         self.clear_cache()
 
     def add_system(self, system_instance, priority=0):
         assert issubclass(system_instance.__class__, System)
         system_instance.priority = priority
         system_instance.world = self
+        system_instance.last_run = -1
         self._systems.append(system_instance)
         self._systems.sort(key=lambda system: system.priority, reverse=True)
 
+        for component_type in system_instance.tracks:
+            self._track(component_type)
+
     def remove_system(self, system_type):
-        for system in self._systems:
-            if type(system) == system_type:
-                system.world = None
-                self._systems.remove(system)
+        for system in [system for system in self._systems if type(system) == system_type]:
+            system.world = None
+            self._systems.remove(system)
+
+            for observer in self._owned.pop(system, ()):
+                self.unobserve(observer)
+            for component_type in system.tracks:
+                self._untrack(component_type)
 
     def get_system(self, system_type):
         for system in self._systems:
             if type(system) == system_type:
                 return system
 
+    def is_alive(self, entity):
+        return entity in self._entities
+
+    def _queries_of(self, component_types):
+        queries = {}
+        for component_type in component_types:
+            for query in self._type_queries.get(component_type, ()):
+                queries[query] = None
+        return queries
+
+    def _insert(self, entity, components):
+        if not components: return
+
+        if self._storage is not None:
+            columnar = [component for component in components.values() if self._storage.supports(type(component))]
+            if columnar: components.update(self._storage.assign(entity, columnar))
+
+        component_db = self._components
+        for component_type in components:
+            if component_type not in component_db:
+                component_db[component_type] = set()
+            component_db[component_type].add(entity)
+
+        self._entities[entity]                    = components
+        self._entities.masks[entity & INDEX_MASK] = self.component_mask(components)
+
+        for query in self._queries_of(components):
+            query.match(entity, components)
+
+    def _assign(self, entity, components):
+        old = self._entities[entity]
+        if not old:
+            self._insert(entity, components)
+            return
+
+        added   = [component for component_type, component in components.items() if old.get(component_type) is not component]
+        removed = [component_type for component_type in old if component_type not in components]
+        if not added and not removed: return
+
+        if self._storage is not None:
+            views = self._storage.assign(
+                entity,
+                [component for component in added if self._storage.supports(type(component))],
+                [component_type for component_type in removed if self._storage.supports(component_type)]
+            )
+            components.update(views)
+
+        for component_type in removed:
+            self._components[component_type].discard(entity)
+            if not self._components[component_type]:
+                del self._components[component_type]
+
+        for component in added:
+            component_type = type(component)
+            if component_type not in self._components:
+                self._components[component_type] = set()
+            self._components[component_type].add(entity)
+
+        self._entities[entity]                    = components
+        self._entities.masks[entity & INDEX_MASK] = self.component_mask(components)
+
+        for query in self._queries_of([type(component) for component in added] + removed):
+            if components: query.match(entity, components)
+            else:          query.discard(entity)
+
     def create_entity(self, *components):
-        self._next_entity_id += 1
-        for component in components:
-            self.add_component(self._next_entity_id, component)
-        return self._next_entity_id
+        entity = self._entities.allocate()
+        self._insert(entity, { type(component): component for component in components })
+        return entity
 
-    def delete_entity(self, entity, immediate=False):
-        if immediate:
-            for component_type in self._entities[entity]:
-                self._components[component_type].discard(entity)
+    def create_entities(self, count, *components, **component_columns):
+        entities = self._entities.allocate_many(count)
+        if count == 0: return entities
+
+        columns = {}
+        for values in (*components, *component_columns.values()):
+            if isinstance(values, (list, tuple)):
+                assert len(values) == count
+                columns[type(values[0])] = list(values)
+            else:
+                columns[type(values)] = values
+
+        instances = {}
+        if self._storage is not None:
+            columnar = [(component_type, values) for component_type, values in columns.items() if self._storage.supports(component_type)]
+            if columnar: instances.update(self._storage.add_many(entities, columnar))
+
+        for component_type, values in columns.items():
+            if component_type in instances: continue
+            instances[component_type] = values if isinstance(values, list) else [clone_component(values) for _ in entities]
 
-                if not self._components[component_type]:
-                    del self._components[component_type]
+        component_types = list(columns)
+        for component_type in component_types:
+            self._components.setdefault(component_type, set()).update(entities)
 
-                del self._entities[entity]
-                self.clear_cache()
+        entity_db, mask = self._entities, self.component_mask(component_types)
+        for entity, row in zip(entities, zip(*[instances[component_type] for component_type in component_types])):
+            entity_db[entity]                    = dict(zip(component_types, row))
+            entity_db.masks[entity & INDEX_MASK] = mask
 
-        else:
-            self._dead_entities.add(entity)
+        for query in self._queries_of(component_types):
+            for entity in entities:
+                query.match(entity, entity_db[entity])
+
+        return entities
+
+    def snapshot(self, assets=None):
+        from snapshot import capture
+        return capture(self, assets)
+
+    def restore(self, snapshot, assets=None):
+        from snapshot import restore
+        restore(self, snapshot, assets)
+
+    def fork(self):
+        from snapshot import copy_systems
+
+        world = World(columnar=self._storage is not None, workers=self._scheduler.workers)
+        for system in copy_systems(self._systems, self):
+            world.add_system(system, system.priority)
+
+        world.restore(self.snapshot())
+        return world
+
+    def apply_commands(self):
+        if not self.commands: return
+
+        pending = {}
+        for op, entity, arg in self.commands.take():
+            if op == 'spawn':
+                pending[entity] = { type(component): component for component in arg }
+                continue
+
+            if entity not in pending:
+                if entity not in self._entities: continue
+                pending[entity] = dict(self._entities[entity])
+
+            components = pending[entity]
+            if components is None: continue
+
+            if   op == 'destroy': pending[entity] = None
+            elif op == 'add':     components[type(arg)] = arg
+            elif op == 'remove':  components.pop(arg, None)
+
+        for entity, components in pending.items():
+            if components is None:
+                alive = self._entities.get(entity)
+                if alive is not None: self._destroy(entity, alive)
+            else:
+                self._assign(entity, components)
+
+    def _destroy(self, entity, components):
+        for component_type in components:
+            self._components[component_type].discard(entity)
+
+            if not self._components[component_type]:
+                del self._components[component_type]
+
+            for query in self._type_queries.get(component_type, ()):
+                query.discard(entity)
+
+        del self._entities[entity]
+        if self._storage is not None: self._storage.delete(entity)
+
+    def delete_entity(self, entity, immediate=False):
+        components = self._entities.get(entity)
+        if components is None: raise StaleEntityError(entity)
+
+        if immediate: self._destroy(entity, components)
+        else:         self._dead_entities.add(entity)
 
     def add_component(self, entity, component_instance):
         component_type = type(component_instance)
+        if entity not in self._entities: raise StaleEntityError(entity)
+
+        if self._storage is not None and self._storage.supports(component_type):
+            component_instance = self._storage.add(entity, component_instance)
 
         if component_type not in self._components:
             self._components[component_type] = set()
 
         self._components[component_type].add(entity)
 
-        if entity not in self._entities:
-            self._entities[entity] = {}
+        components                                 = self._entities[entity]
+        components[component_type]                 = component_instance
+        self._entities.masks[entity & INDEX_MASK] |= self.component_bit(component_type)
 
-        self._entities[entity][component_type] = component_instance
-        self.clear_cache()
+        for query in self._type_queries.get(component_type, ()):
+            query.match(entity, components)
 
     def remove_component(self, entity, component_type):
-        self._components[component_type].discard(entity)
+        components = self._entities[entity]
+        del components[component_type]
+        self._entities.masks[entity & INDEX_MASK] &= ~self.component_bit(component_type)
 
+        self._components[component_type].discard(entity)
         if not self._components[component_type]:
             del self._components[component_type]
 
-        del self._entities[entity][component_type]
+        if self._storage is not None and self._storage.supports(component_type):
+            self._storage.remove(entity, component_type)
 
-        if not self._entities[entity]:
-            del self._entities[entity]
+        for query in self._type_queries.get(component_type, ()):
+            if components: query.match(entity, components)
+            else:          query.discard(entity)
 
-        self.clear_cache()
         return entity
 
     def has_component(self, entity, component_type):
         return component_type in self._entities[entity]
 
+    def is_columnar(self, *component_types):
+        if self._storage is None: return False
+        return all(self._storage.supports(ct) for ct in component_types)
+
+    def get_columns(self, *component_types):
+        if self._storage is None: return []
+
+        columns = list(self._storage.columns(*component_types))
+        if self._profiler is not None: self._profiler.count(sum(len(ents) for ents, cols in columns))
+        return columns
+
     def _get_component(self, component_type):
         entity_db = self._entities
 
@@ -104,45 +600,227 @@ class World:
         entity_db    = self._entities
         component_db = self._components
 
-        try:
-            for entity in set.intersection(*[component_db[ct] for ct in component_types]):
-                yield entity, [entity_db[entity][ct] for ct in component_types]
-        except KeyError:
-            pass
+        entity_sets = [component_db.get(ct) for ct in component_types]
+        if not all(entity_sets): return
+
+        for entity in set.intersection(*entity_sets):
+            components = entity_db[entity]
+            yield entity, [components[ct] for ct in component_types]
+
+    def _query(self, component_types, single):
+        key = single, component_types
+
+        if key not in self._queries:
+            query = Query(component_types, single=single)
+            rows  = self._get_component(*component_types) if single else self._get_components(*component_types)
+            for entity, row in rows:
+                query.rows[entity] = entity, row
+
+            self._queries[key] = query
+            self._register(query)
+
+        return self._queries[key]
+
+    def component_bit(self, component_type):
+        bit = self._bits.get(component_type)
+        if bit is None: bit = self._bits[component_type] = 1 << len(self._bits)
+        return bit
+
+    def component_mask(self, component_types):
+        bits, mask = self._bits, 0
+        for component_type in component_types:
+            mask |= bits.get(component_type) or self.component_bit(component_type)
+        return mask
+
+    def query(self, with_=(), without=(), optional=()):
+        key   = tuple(with_), tuple(without), tuple(optional)
+        query = self._compiled.get(key)
+
+        if query is None:
+            if not key[0]: raise ValueError('a query needs at least one component type in with_')
+            query = self._compiled[key] = CompiledQuery(self, *key)
+            self.observe(query)
+
+        if self._profiler is not None: self._profiler.count(len(query))
+        return query
+
+    def _register(self, query):
+        for component_type in set(query.component_types):
+            self._type_queries.setdefault(component_type, []).append(query)
+
+    def observe(self, observer, owner=None):
+        for entity, components in self._entities.items():
+            observer.match(entity, components)
+
+        self._observers.append(observer)
+        self._register(observer)
+        if owner is not None: self._owned.setdefault(owner, []).append(observer)
+
+    def observes(self, observer):
+        return any(other is observer for other in self._observers)
+
+    def unobserve(self, observer):
+        if not self.observes(observer): return
+
+        self._observers = [other for other in self._observers if other is not observer]
+        for component_type in set(observer.component_types):
+            queries = self._type_queries.get(component_type, [])
+            queries[:] = [query for query in queries if query is not observer]
+
+        for owner, observers in self._owned.items():
+            observers[:] = [other for other in observers if other is not observer]
+
+    def _track(self, component_type):
+        log = self._changes.get(component_type)
+        if log is None:
+            log = self._changes[component_type] = ChangeLog(self, component_type)
+            self.observe(log)
+        return log
+
+    def _untrack(self, component_type):
+        if component_type in self._tracked: return
+        if any(component_type in system.tracks for system in self._systems): return
+
+        log = self._changes.pop(component_type, None)
+        if log is not None: self.unobserve(log)
+
+    def track(self, component_type):
+        self._tracked.add(component_type)
+        return self._track(component_type)
+
+    def change_tick(self):
+        tick = getattr(self._local, 'tick', None)
+        return self._tick if tick is None else tick
+
+    def _change_log(self, component_type):
+        log = self._changes.get(component_type)
+        if log is None: raise KeyError(f'{component_type.__name__} changes are not tracked, call World.track first')
+        return log
+
+    def _since(self, since):
+        if since is not None: return since
+        return getattr(self._local, 'since', -1)
+
+    def added(self, component_type, since=None):
+        log, entity_db = self._change_log(component_type), self._entities
+        return [(entity, entity_db[entity][component_type]) for entity in log.since(log.added, self._since(since))]
+
+    def changed(self, component_type, since=None):
+        log, entity_db = self._change_log(component_type), self._entities
+        return [(entity, entity_db[entity][component_type]) for entity in log.since(log.changed, self._since(since))]
+
+    def removed(self, component_type, since=None):
+        log = self._change_log(component_type)
+        return log.since(log.removed, self._since(since))
+
+    def mark_changed(self, entity, component_type):
+        log = self._changes.get(component_type)
+        if log is not None: log.mark(entity, self.change_tick())
+
+    def mark_changed_many(self, entities, component_type):
+        log = self._changes.get(component_type)
+        if log is None: return
+
+        tick = self.change_tick()
+        for entity in entities:
+            log.mark(entity, tick)
+
+    def _prune_changes(self):
+        for component_type, log in self._changes.items():
+            horizon = min((system.last_run for system in self._systems if component_type in system.tracks), default=-1)
+            if horizon >= 0: log.prune(horizon)
 
-    @_lru_cache()
     def get_component(self, component_type):
-        return [query for query in self._get_component(component_type)]
+        result = self._query((component_type, ), True).result()
+        if self._profiler is not None: self._profiler.count(len(result))
+        return result
 
-    @_lru_cache()
     def get_components(self, *component_types):
-        return [query for query in self._get_components(*component_types)]
+        result = self._query(component_types, False).result()
+        if self._profiler is not None: self._profiler.count(len(result))
+        return result
 
-    def try_component(entity, component_type):
-        if component_type in self._entities[entity]:
-            return self._entities[entity][component_type]
-        else:
-            return None
+    def try_component(self, entity, component_type):
+        return self._entities[entity].get(component_type)
 
     def _clear_dead_entities(self):
+        entity_db = self._entities
         for entity in self._dead_entities:
-            for component_type in self._entities[entity]:
-                self._components[component_type].discard(entity)
+            components = entity_db.get(entity)
+            if components is not None: self._destroy(entity, components)
 
-                if not self._components[component_type]:
-                    del self._components[component_type]
+        self._dead_entities.clear()
 
-            del self._entities[entity]
+    def schedule(self):
+        return self._scheduler.build(self._systems)
 
-        self._dead_entities.clear()
-        self.clear_cache()
+    def critical_path(self):
+        self._scheduler.build(self._systems)
+        return self._scheduler.critical_path()
+
+    @property
+    def profiler(self):
+        return self._profiler
+
+    def enable_profiling(self, capacity=600, trace_capacity=100_000):
+        self._profiler = Profiler(capacity, trace_capacity)
+        return self._profiler
+
+    def disable_profiling(self):
+        self._profiler = None
+
+    def end_frame(self):
+        if self._profiler is not None: self._profiler.end_frame()
+
+    def _run_system(self, system, args, kwargs):
+        tick        = next(self._ticks)
+        local       = self._local
+        local.tick  = tick
+        local.since = system.last_run
+        start       = time.perf_counter()
+
+        try:
+            if self._profiler is not None: self._profiler.run(system, args, kwargs)
+            else:                          system.update(*args, **kwargs)
+        finally:
+            self._scheduler.durations[system] = time.perf_counter() - start
+
+            system.last_run = tick
+            local.tick      = None
+            local.since     = None
+            self._tick      = next(self._ticks)
+
+    def _run(self, systems, *args, **kwargs):
+        if self._scheduler.executor is not None:
+            self._scheduler.run(systems, *args, **kwargs)
+            return
+
+        for system in systems:
+            self._run_system(system, args, kwargs)
 
     def _update(self, *args, **kwargs):
-        for system in self._systems:
-            system.update(*args, **kwargs)
+        self._run(self._systems, *args, **kwargs)
 
     def update(self, *args, **kwargs):
         self._clear_dead_entities()
+        self._prune_changes()
         self._update(*args, **kwargs)
+        self.apply_commands()
+        self.end_frame()
+
+    def step(self, phase, *args, **kwargs):
+        self._clear_dead_entities()
+        self._prune_changes()
+        self._run([system for system in self._systems if system.phase == phase], *args, **kwargs)
+        self.apply_commands()
+
+    def close(self):
+        self._scheduler.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 CachedWorld = World
@@ -0,0 +1,339 @@
+import numpy as np
+import time
+
+from components import RectangleColliderComponent
+from components import ResetPositionComponent
+from components import ObstacleTagComponent
+from components import ScrollableComponent
+from components import TransformComponent
+from components import RigidBodyComponent
+from components import PlayerTagComponent
+from components import PipeStateComponent
+from components import PipeTagComponent
+from components import ScoreComponent
+from components import FlapComponent
+from components import GameComponent
+
+from systems import ResetPipeStateSystem
+from systems import ResetPositionSystem
+from systems import ScrollableSystem
+from systems import MovementSystem
+from systems import GravitySystem
+
+from game import InputManager
+from game import build_world
+from game import DISPLAY
+
+from render import PixelObserver
+from render import RenderTarget
+from assets import AssetManager
+from replay import final_score
+from ecs import System
+from ecs import World
+
+import pygame as pg
+import physics
+
+class BatchFlapSystem(System):
+    reads  = (FlapComponent, GameComponent)
+    writes = (RigidBodyComponent, )
+
+    def __init__(self):
+        super().__init__()
+
+    def update(self, actions, *args, **kwargs):
+        for ents, (flap, rigid, game) in self.world.get_columns(FlapComponent, RigidBodyComponent, GameComponent):
+            mask                  = actions[game['index']]
+            rigid['vel'][mask, 0] = 0
+            rigid['vel'][mask, 1] = flap['force'][mask]
+
+class BatchPipeOffsetSystem(System):
+    reads  = (ResetPositionComponent, GameComponent)
+    writes = (TransformComponent, )
+
+    def __init__(self, n_games, offset_range, rng):
+        super().__init__()
+        self.n_games      = n_games
+        self.offset_range = offset_range
+        self.rng          = rng
+
+    def update(self, *args, **kwargs):
+        offsets = None
+
+        for ents, (trans, reset, game) in self.world.get_columns(TransformComponent, ResetPositionComponent, GameComponent):
+            mask = trans['pos'][:, 1] <= reset['pos'][:, 1]
+            if not mask.any(): continue
+
+            if offsets is None: offsets = self.rng.integers(*self.offset_range, size=self.n_games)
+            trans['pos'][mask, 1] += offsets[game['index'][mask]]
+
+class BatchCollisionSystem(System):
+    reads  = (TransformComponent, RigidBodyComponent, ResetPositionComponent, RectangleColliderComponent, ObstacleTagComponent, GameComponent)
+    writes = ('dones', )
+
+    def __init__(self, h, n_games, player_collider, pipe_collider, dones):
+        super().__init__()
+        self.h           = h
+        self.dones       = dones
+        self.player_pos  = np.empty((n_games, 2))
+        self.player_off  = np.array(player_collider.pos.to_tuple())
+        self.player_size = np.array((player_collider.w, player_collider.h))
+        self.pipe_off    = np.array(pipe_collider.pos.to_tuple())
+        self.pipe_size   = np.array((pipe_collider.w, pipe_collider.h))
+
+    def _to_screen(self, pos, offset):
+        pos       = pos + offset
+        pos[:, 1] = self.h - pos[:, 1]
+        return pos
+
+    def update(self, *args, **kwargs):
+        player_pos = self.player_pos
+        for ents, (trans, rigid, game) in self.world.get_columns(TransformComponent, RigidBodyComponent, GameComponent):
+            player_pos[game['index']] = self._to_screen(trans['pos'], self.player_off)
+
+        for ents, (trans, reset, game) in self.world.get_columns(TransformComponent, ResetPositionComponent, GameComponent):
+            index = game['index']
+            pos   = self._to_screen(trans['pos'], self.pipe_off)
+            hit   = physics.aabb_aabb_overlap(player_pos[index], self.player_size, pos, self.pipe_size)
+            self.dones[index[hit]] = True
+
+        for ent, (trans, col, tag) in self.world.get_components(TransformComponent, RectangleColliderComponent, ObstacleTagComponent):
+            pos   = self._to_screen(np.array([trans.pos.to_tuple()]), np.array(col.pos.to_tuple()))
+            hit   = physics.aabb_aabb_overlap(player_pos, self.player_size, pos, np.array((col.w, col.h)))
+            self.dones[hit] = True
+
+class BatchScoreSystem(System):
+    reads  = (TransformComponent, RigidBodyComponent, GameComponent)
+    writes = (PipeStateComponent, ScoreComponent, 'rewards')
+
+    def __init__(self, n_games, player_collider, pipe_collider, rewards):
+        super().__init__()
+        self.rewards  = rewards
+        self.player_x = np.empty(n_games)
+        self.player_c = player_collider.pos.x
+        self.pipe_c   = pipe_collider.pos.x + pipe_collider.w
+        self.passed   = np.zeros(n_games, dtype=np.int64)
+
+    def update(self, *args, **kwargs):
+        self.passed[:] = 0
+
+        for ents, (trans, rigid, game) in self.world.get_columns(TransformComponent, RigidBodyComponent, GameComponent):
+            self.player_x[game['index']] = trans['pos'][:, 0] + self.player_c
+
+        for ents, (trans, state, game) in self.world.get_columns(TransformComponent, PipeStateComponent, GameComponent):
+            index  = game['index']
+            passed = ~state['value'] & (self.player_x[index] > trans['pos'][:, 0] + self.pipe_c)
+
+            state['value'][passed]     = True
+            self.passed[index[passed]] = 1
+
+        for ents, (score, game) in self.world.get_columns(ScoreComponent, GameComponent):
+            score['value'] += self.passed[game['index']]
+
+        self.rewards += self.passed
+
+class FlappyBatchEnv(object):
+    h               = 980
+    gravity         = -900
+    flap_force      = 400
+    player_pos      = (180, 490)
+    pipe_gap        = 200
+    pipe_pos_x      = 709
+    pipe_down_pos_y = -396.5 + 260
+    pipe_up_pos_y   = pipe_down_pos_y + 793
+    offset_range    = (0, 470)
+
+    def __init__(self, n_games, dt=1 / 60, seed=None):
+        self.n_games = n_games
+        self.dt      = dt
+        self.rng     = np.random.default_rng(seed)
+        self.rewards = np.zeros(n_games, dtype=np.float32)
+        self.dones   = np.zeros(n_games, dtype=bool)
+        self.scores  = np.zeros(n_games, dtype=np.int64)
+        self.obs     = np.zeros((n_games, 5), dtype=np.float32)
+
+        self.player_collider = RectangleColliderComponent(x=-40, y=-40, w=80, h=60)
+        self.pipe_collider   = RectangleColliderComponent(x=-69, y=-396.5, w=138, h=793)
+
+        self.world = World(columnar=True)
+        self.world.add_system(GravitySystem(force=self.gravity), priority=8)
+        self.world.add_system(BatchFlapSystem(), priority=7)
+        self.world.add_system(MovementSystem(), priority=6)
+        self.world.add_system(ScrollableSystem(), priority=4)
+        self.world.add_system(BatchCollisionSystem(self.h, n_games, self.player_collider, self.pipe_collider, self.dones), priority=3)
+        self.world.add_system(BatchScoreSystem(n_games, self.player_collider, self.pipe_collider, self.rewards), priority=2)
+        self.world.add_system(ResetPositionSystem(None), priority=-2)
+        self.world.add_system(BatchPipeOffsetSystem(n_games, self.offset_range, self.rng), priority=-3)
+        self.world.add_system(ResetPipeStateSystem(), priority=-5)
+
+        self._create_floors()
+        self._create_games(n_games)
+
+    def _create_floors(self):
+        for i in range(2):
+            self.world.create_entity(
+                TransformComponent(i * 640, self.h),
+                ScrollableComponent(-150, 0),
+                ResetPositionComponent(640, self.h, -640),
+                RectangleColliderComponent(x=0, y=self.h - 190, w=640, h=190),
+                ObstacleTagComponent()
+            )
+
+    def _create_games(self, n_games):
+        games = [GameComponent(game) for game in range(n_games)]
+
+        self.world.create_entities(
+            n_games,
+            TransformComponent(*self.player_pos),
+            RigidBodyComponent(),
+            FlapComponent(force=self.flap_force),
+            PlayerTagComponent(),
+            ScoreComponent(),
+            games
+        )
+
+        pipe_up_pos_y = self.pipe_up_pos_y + self.pipe_gap
+        self.world.create_entities(
+            n_games,
+            TransformComponent(self.pipe_pos_x, pipe_up_pos_y),
+            ScrollableComponent(-150, 0),
+            ResetPositionComponent(self.pipe_pos_x, pipe_up_pos_y, -69),
+            ObstacleTagComponent(),
+            PipeTagComponent(),
+            games
+        )
+
+        self.world.create_entities(
+            n_games,
+            TransformComponent(self.pipe_pos_x, self.pipe_down_pos_y),
+            ScrollableComponent(-150, 0),
+            ResetPositionComponent(self.pipe_pos_x, self.pipe_down_pos_y, -69),
+            ObstacleTagComponent(),
+            PipeTagComponent(),
+            PipeStateComponent(),
+            games
+        )
+
+    def _reset_games(self, mask):
+        world = self.world
+
+        for ents, (trans, rigid, score, game) in world.get_columns(TransformComponent, RigidBodyComponent, ScoreComponent, GameComponent):
+            index = game['index']
+            done  = mask[index]
+
+            self.scores[index[done]] = score['value'][done]
+            trans['pos'][done]       = self.player_pos
+            rigid['vel'][done]       = 0
+            rigid['acc'][done]       = 0
+            score['value'][done]     = 0
+
+        for ents, (trans, reset, game) in world.get_columns(TransformComponent, ResetPositionComponent, GameComponent):
+            done               = mask[game['index']]
+            trans['pos'][done] = reset['pos'][done]
+
+        for ents, (state, game) in world.get_columns(PipeStateComponent, GameComponent):
+            state['value'][mask[game['index']]] = False
+
+        world.get_system(BatchPipeOffsetSystem).update()
+
+    def _observe(self):
+        obs = self.obs
+
+        for ents, (trans, rigid, game) in self.world.get_columns(TransformComponent, RigidBodyComponent, GameComponent):
+            index         = game['index']
+            obs[index, 0] = trans['pos'][:, 1]
+            obs[index, 1] = rigid['vel'][:, 1]
+            obs[index, 2] = -trans['pos'][:, 0]
+
+        for ents, (trans, state, game) in self.world.get_columns(TransformComponent, PipeStateComponent, GameComponent):
+            index          = game['index']
+            gap_bottom     = trans['pos'][:, 1] + self.pipe_collider.pos.y
+            obs[index, 2] += trans['pos'][:, 0]
+            obs[index, 3]  = gap_bottom - obs[index, 0]
+            obs[index, 4]  = gap_bottom + self.pipe_gap - obs[index, 0]
+
+        return obs.copy()
+
+    def reset(self):
+        self.dones[:] = True
+        self._reset_games(self.dones)
+        self.dones[:] = False
+        return self._observe()
+
+    def step(self, actions):
+        actions         = np.asarray(actions, dtype=bool)
+        self.rewards[:] = 0
+        self.dones[:]   = False
+
+        self.world.update(dt=self.dt, actions=actions)
+        self.rewards[self.dones] = -1
+
+        if self.dones.any(): self._reset_games(self.dones)
+        return self._observe(), self.rewards.copy(), self.dones.copy()
+
+    def close(self):
+        self.world.close()
+
+class FlappyPixelEnv(object):
+    def __init__(self, size=(84, 84), stack=4, dt=1 / 60, frame_skip=1, seed=None, columnar=False, smooth=False, render='baked', swept=False):
+        self.dt         = dt
+        self.frame_skip = frame_skip
+        self.columnar   = columnar
+        self.render     = render
+        self.swept      = swept
+        self.rng        = np.random.RandomState(seed)
+        self.target     = RenderTarget(DISPLAY)
+        self.observer   = PixelObserver(self.target, size, stack, smooth)
+        self.assets     = AssetManager()
+        self.inputs     = InputManager()
+        self.world      = None
+        self.score      = 0
+
+        pg.font.init()
+        self.font = pg.font.Font(None, 50)
+
+    def _done(self):
+        return not self.world.get_component(PlayerTagComponent)
+
+    def _render(self):
+        self.world.step('render', dt=self.dt)
+        self.world.end_frame()
+        return self.observer.capture()
+
+    def reset(self):
+        self.close()
+        self.world = World(columnar=self.columnar)
+        self.score = 0
+        build_world(self.world, self.target.surface, self.assets, self.font, render=self.render, rng=self.rng, swept=self.swept)
+
+        self.observer.reset()
+        return self._render()
+
+    def step(self, action):
+        for i in range(self.frame_skip):
+            self.inputs.set_flags(int(action) if i == 0 else 0)
+            self.world.step('simulation', dt=self.dt, inputs=self.inputs)
+            if self._done(): break
+
+        score        = final_score(self.world)
+        reward, done = score - self.score, self._done()
+        self.score   = score
+        return self._render(), (-1 if done else reward), done
+
+    def close(self):
+        if self.world is not None: self.world.close()
+
+if __name__ == '__main__':
+    n_games = 4096
+    n_steps = 1000
+
+    env = FlappyBatchEnv(n_games, seed=0)
+    env.reset()
+
+    rng   = np.random.default_rng(0)
+    start = time.time()
+    for step in range(n_steps):
+        env.step(rng.random(n_games) < 0.05)
+    elapsed = time.time() - start
+
+    print(f'{n_games * n_steps / elapsed * 60:,.0f} env-steps per minute')
@@ -0,0 +1,239 @@
+import pygame as pg
+
+from components import SpriteSheetSequenceComponent
+from components import RectangleColliderComponent
+from components import ResetPositionComponent
+from components import ObstacleTagComponent
+from components import ScrollableComponent
+from components import RenderableComponent
+from components import TransformComponent
+from components import RigidBodyComponent
+from components import PlayerTagComponent
+from components import PipeStreamComponent
+from components import PipeStateComponent
+from components import PipeTagComponent
+from components import ScoreComponent
+from components import PipeComponent
+from components import FlapComponent
+
+from systems import BakedRenderableSystem
+from systems import SpriteSheetSequenceSystem
+from systems import ResetPositionSystem
+from systems import PlayerStateSystem
+from systems import ScoreRenderSystem
+from systems import ScrollableSystem
+from systems import PipeStreamSystem
+from systems import RenderableSystem
+from systems import CollisionSystem
+from systems import MovementSystem
+from systems import GravitySystem
+from systems import ScoreSystem
+from systems import FlapSystem
+from systems import TiltSystem
+
+DISPLAY    = (640, 980)
+INPUT_KEYS = ('SPACE_BAR', )
+
+class InputManager(object):
+    def __init__(self):
+        self.KEYS = { key: False for key in INPUT_KEYS }
+
+    def update(self, events):
+        for event in events:
+            if event.type == pg.KEYDOWN:
+                if event.key == pg.K_SPACE:
+                    self.KEYS['SPACE_BAR'] = True
+
+    def consume(self):
+        self.KEYS['SPACE_BAR'] = False
+
+    def flags(self):
+        return sum(1 << i for i, key in enumerate(INPUT_KEYS) if self.KEYS[key])
+
+    def set_flags(self, flags):
+        for i, key in enumerate(INPUT_KEYS):
+            self.KEYS[key] = bool(flags >> i & 1)
+
+    def __getitem__(self, index):
+        if index not in self.KEYS: return False
+        return self.KEYS[index]
+
+PIPE_SPAWN_X = 709
+PIPE_THRESH  = -69
+PIPE_SPACING = PIPE_SPAWN_X - PIPE_THRESH
+
+def build_world(world, window, assets, score_font=None, render='full', rng=None, pipes=1, pipe_spacing=PIPE_SPACING, swept=False):
+    if pipes * pipe_spacing < PIPE_SPACING: raise ValueError(f'{pipes} pipe pairs {pipe_spacing}px apart cannot cover the {PIPE_SPACING}px screen span')
+
+    gravity_system         = GravitySystem(force=-900)
+    flap_system            = FlapSystem()
+    movement_system        = MovementSystem()
+    tilt_system            = TiltSystem()
+    scrollable_system      = ScrollableSystem()
+    collision_system       = CollisionSystem(window, swept=swept)
+    score_system           = ScoreSystem()
+    sprite_sheet_system    = SpriteSheetSequenceSystem()
+    resetposition_system   = ResetPositionSystem(window)
+    pipestream_system      = PipeStreamSystem((0, 470), thresh=PIPE_THRESH, rng=rng)
+    playerstate_system     = PlayerStateSystem(ScrollableComponent(-150, 0), assets.load('./res/flappy_dead.png', (100, 80)))
+
+    world.add_system(gravity_system, priority=8)
+    world.add_system(flap_system, priority=7)
+    world.add_system(movement_system, priority=6)
+    world.add_system(tilt_system, priority=5)
+    world.add_system(scrollable_system, priority=4)
+    world.add_system(collision_system, priority=3)
+    world.add_system(score_system, priority=2)
+    world.add_system(sprite_sheet_system, priority=1)
+
+    if render is not None:
+        renderable_system  = BakedRenderableSystem(window) if render == 'baked' else RenderableSystem(window)
+        scorerender_system = ScoreRenderSystem(window, score_font)
+
+        world.add_system(renderable_system, priority=0)
+        world.add_system(scorerender_system, priority=-1)
+
+    world.add_system(resetposition_system, priority=-2)
+    world.add_system(pipestream_system, priority=-3)
+    world.add_system(playerstate_system, priority=-4)
+
+    player = world.create_entity(
+        TransformComponent(180, 490, rot=45),
+        RenderableComponent(sprite=None, x=-50, y=-40, size=None, depth=10),
+        SpriteSheetSequenceComponent(
+            spritesheet = assets.load('./res/flappy.png'),
+            size        = (100, 80),
+            n_row       = 1,
+            n_col       = 4,
+            duration    = 0.1
+        ),
+        RigidBodyComponent(),
+        FlapComponent(force=400),
+        RectangleColliderComponent(x=-40, y=-40, w=80, h=60),
+        PlayerTagComponent(),
+        ScoreComponent()
+    )
+
+    sky = world.create_entity(
+        TransformComponent(0, 980),
+        RenderableComponent(
+            sprite = assets.load('./res/sky.jpg', (640, 980), alpha=False),
+            x      = 0,
+            y      = 0,
+            size   = (640, 980),
+            depth  = 0
+        )
+    )
+
+    clouds = [
+        world.create_entity(
+            TransformComponent(i * 640, 980),
+            RenderableComponent(
+                sprite = assets.load('./res/clouds.png', (640, 980)),
+                x      = 0,
+                y      = 0,
+                size   = (640, 980),
+                depth  = 1
+            ),
+            ScrollableComponent(-12, 0),
+            ResetPositionComponent(640, 980, -640)
+        )
+        for i in range(2)
+    ]
+
+    buildings = [
+        world.create_entity(
+            TransformComponent(i * 640, 980),
+            RenderableComponent(
+                sprite = assets.load('./res/buildings.png', (640, 980)),
+                x      = 0,
+                y      = 0,
+                size   = (640, 980),
+                depth  = 2
+            ),
+            ScrollableComponent(-16, 0),
+            ResetPositionComponent(640, 980, -640)
+        )
+        for i in range(2)
+    ]
+
+    trees = [
+        world.create_entity(
+            TransformComponent(i * 640, 980),
+            RenderableComponent(
+                sprite = assets.load('./res/trees.png', (640, 980)),
+                x      = 0,
+                y      = 0,
+                size   = (640, 980),
+                depth  = 3
+            ),
+            ScrollableComponent(-22, 0),
+            ResetPositionComponent(640, 980, -640)
+        )
+        for i in range(2)
+    ]
+
+    floor = [
+        world.create_entity(
+            TransformComponent(i * 640, 980),
+            RenderableComponent(
+                sprite = assets.load('./res/floor.png', (640, 980)),
+                x      = 0,
+                y      = 0,
+                size   = (640, 980),
+                depth  = 5
+            ),
+            ScrollableComponent(-150, 0),
+            ResetPositionComponent(640, 980, -640),
+            RectangleColliderComponent(x=0, y=980 - 190, w=640, h=190),
+            ObstacleTagComponent()
+        )
+        for i in range(2)
+    ]
+
+    pipe_gap        = 200
+    pipe_down_pos_y = -396.5 + 260
+    pipe_up_pos_y   = pipe_down_pos_y + 793 + pipe_gap
+
+    stream  = PipeStreamComponent(pipes, pipe_spacing)
+    offsets = [pipestream_system.next_offset(stream) for pair in range(pipes)]
+    world.create_entity(stream)
+
+    pipe_x = [PIPE_SPAWN_X + pair * pipe_spacing for pair in range(pipes)]
+
+    pipes_up = world.create_entities(
+        pipes,
+        [TransformComponent(x, pipe_up_pos_y + offset) for x, offset in zip(pipe_x, offsets)],
+        RenderableComponent(
+            sprite = assets.load('./res/pipe_up.png', (138, 793)),
+            x      = -69,
+            y      = -396.5,
+            size   = (138, 793),
+            depth  = 4
+        ),
+        ScrollableComponent(-150, 0),
+        RectangleColliderComponent(x=-69, y=-396.5, w=138, h=793),
+        ObstacleTagComponent(),
+        PipeTagComponent(),
+        [PipeComponent(pair, pipe_up_pos_y) for pair in range(pipes)]
+    )
+
+    pipes_down = world.create_entities(
+        pipes,
+        [TransformComponent(x, pipe_down_pos_y + offset) for x, offset in zip(pipe_x, offsets)],
+        RenderableComponent(
+            sprite = assets.load('./res/pipe_down.png', (138, 793)),
+            x      = -69,
+            y      = -396.5,
+            size   = (138, 793),
+            depth  = 4
+        ),
+        ScrollableComponent(-150, 0),
+        RectangleColliderComponent(x=-69, y=-396.5, w=138, h=793),
+        ObstacleTagComponent(),
+        PipeTagComponent(),
+        PipeStateComponent(),
+        [PipeComponent(pair, pipe_down_pos_y) for pair in range(pipes)]
+    )
+
+    return world
@@ -0,0 +1,116 @@
+from components import TransformComponent
+
+from maths import match_positions
+
+import numpy as np
+import time
+
+class TransformInterpolator(object):
+    def __init__(self, world, snap=64):
+        self.world    = world
+        self.snap     = snap
+        self.previous = None
+        self.current  = None
+
+    def _capture(self):
+        if self.world.is_columnar(TransformComponent):
+            columns = self.world.get_columns(TransformComponent)
+            if not columns: return np.zeros(0, dtype=np.int64), np.zeros((0, 2)), np.zeros(0)
+
+            ents = np.concatenate([ents for ents, (trans, ) in columns])
+            pos  = np.concatenate([trans['pos'] for ents, (trans, ) in columns])
+            rot  = np.concatenate([trans['rot'] for ents, (trans, ) in columns])
+            return ents, pos, rot
+
+        components = self.world.get_component(TransformComponent)
+        ents       = np.array([ent for ent, trans in components], dtype=np.int64)
+        pos        = np.array([(trans.pos.x, trans.pos.y) for ent, trans in components], dtype=np.float64).reshape(-1, 2)
+        rot        = np.array([np.nan if trans.rot is None else trans.rot for ent, trans in components], dtype=np.float64)
+        return ents, pos, rot
+
+    def _apply(self, pos, rot):
+        if self.world.is_columnar(TransformComponent):
+            start = 0
+            for ents, (trans, ) in self.world.get_columns(TransformComponent):
+                end             = start + len(ents)
+                trans['pos'][:] = pos[start:end]
+                trans['rot'][:] = rot[start:end]
+                start           = end
+            return
+
+        for (ent, trans), (x, y), r in zip(self.world.get_component(TransformComponent), pos.tolist(), rot.tolist()):
+            trans.pos.x = x
+            trans.pos.y = y
+            trans.rot   = None if r != r else r
+
+    def capture_previous(self):
+        self.previous = self._capture()
+
+    def capture_current(self):
+        self.current = self._capture()
+
+    def blend(self, alpha):
+        if self.previous is None or self.current is None: return
+
+        ents, pos, rot                = self.current
+        prev_ents, prev_pos, prev_rot = self.previous
+
+        if len(prev_ents) == 0: return
+
+        known, found = match_positions(ents, pos, prev_ents, prev_pos, self.snap)
+
+        blend_pos, blend_rot = pos.copy(), rot.copy()
+        blend_pos[known]     = prev_pos[found] + (pos[known] - prev_pos[found]) * alpha
+        blend_rot[known]     = prev_rot[found] + (rot[known] - prev_rot[found]) * alpha
+
+        self._apply(blend_pos, blend_rot)
+
+    def restore(self):
+        if self.current is None: return
+
+        ents, pos, rot = self.current
+        self._apply(pos, rot)
+
+class FixedTimestepLoop(object):
+    def __init__(self, world, rate=60, max_frame_time=0.25, interpolate=True, snap=64, on_step=None):
+        self.world          = world
+        self.dt             = 1 / rate
+        self.max_frame_time = max_frame_time
+        self.accumulator    = 0
+        self.steps          = 0
+        self.on_step        = on_step
+        self.interpolator   = TransformInterpolator(world, snap) if interpolate else None
+
+    def _step(self, *args, **kwargs):
+        self.world.step('simulation', *args, dt=self.dt, **kwargs)
+        self.steps += 1
+        if self.on_step is not None: self.on_step()
+
+    def advance(self, frame_time, *args, **kwargs):
+        self.accumulator += min(frame_time, self.max_frame_time)
+        n_steps           = int(self.accumulator / self.dt)
+        self.accumulator -= n_steps * self.dt
+
+        for i in range(n_steps):
+            if self.interpolator is not None and i == n_steps - 1:
+                self.interpolator.capture_previous()
+            self._step(*args, **kwargs)
+
+        if self.interpolator is not None:
+            if n_steps > 0: self.interpolator.capture_current()
+            self.interpolator.blend(self.accumulator / self.dt)
+
+        self.world.step('render', *args, dt=frame_time, **kwargs)
+
+        if self.interpolator is not None:
+            self.interpolator.restore()
+
+        self.world.end_frame()
+        return n_steps
+
+    def run(self, steps, *args, **kwargs):
+        start = time.perf_counter()
+        for i in range(steps):
+            self._step(*args, **kwargs)
+            self.world.end_frame()
+        return steps / (time.perf_counter() - start)
@@ -1,16 +1,18 @@
 import numpy as np
 
 class Vector2D:
+    __slots__ = ('x', 'y')
+
     def __init__(self, x=0, y=0):
         self.x = x
         self.y = y
 
     def __eq__(self, vector):
-        assert isinstance(vector, Vector2D)
+        if not isinstance(vector, Vector2D): return NotImplemented
         return self.x == vector.x and self.y == vector.y
 
-    def __neg__(self, vector):
-        assert isinstance(vector, Vector2D)
+    def __ne__(self, vector):
+        if not isinstance(vector, Vector2D): return NotImplemented
         return not (self == vector)
 
     def __neg__(self):
@@ -20,40 +22,31 @@ class Vector2D:
         return Vector2D(abs(self.x), abs(self.y))
 
     def __add__(self, vector):
-        assert isinstance(vector, Vector2D)
         return Vector2D(self.x + vector.x, self.y + vector.y)
 
-    def __radd__(self, vector):
-        assert isinstance(vector, Vector2D)
-        return vector + self
-
     def __iadd__(self, vector):
-        assert isinstance(vector, Vector2D)
         self.x += vector.x
         self.y += vector.y
         return self
 
     def __sub__(self, vector):
-        assert isinstance(vector, Vector2D)
         return Vector2D(self.x - vector.x, self.y - vector.y)
 
-    def __rsub__(self, vector):
-        assert isinstance(vector, Vector2D)
-        return -vector + self
-
     def __isub__(self, vector):
-        assert isinstance(vector, Vector2D)
         self.x -= vector.x
         self.y -= vector.y
         return self
 
     def __mul__(self, value):
-        assert isinstance(value, (int, float))
         return Vector2D(self.x * value, self.y * value)
 
     def __rmul__(self, value):
-        assert isinstance(value, (int, float))
-        return self * value
+        return Vector2D(value * self.x, value * self.y)
+
+    def __imul__(self, value):
+        self.x *= value
+        self.y *= value
+        return self
 
     def __truediv__(self, value):
         assert isinstance(value, (int, float))
@@ -70,7 +63,6 @@ class Vector2D:
         return Vector2D(self.x ** value, self.y ** value)
 
     def dot(self, vector):
-        assert isinstance(vector, Vector2D)
         return Vector2D(self.x * vector.x, self.y * vector.y)
 
     def squared_magnitude(self):
@@ -79,8 +71,77 @@ class Vector2D:
     def magnitude(self):
         return np.sqrt(self.squared_magnitude())
 
+    def set(self, x, y):
+        self.x = x
+        self.y = y
+        return self
+
+    def copy_from(self, vector):
+        self.x = vector.x
+        self.y = vector.y
+        return self
+
+    def add_scaled(self, vector, scale):
+        self.x += vector.x * scale
+        self.y += vector.y * scale
+        return self
+
+    def copy(self):
+        return Vector2D(self.x, self.y)
+
     def to_tuple(self):
         return (self.x, self.y)
 
     def __str__(self):
         return f'({self.x} {self.y})'
+
+class Vector2DArray:
+    __slots__ = ('data', )
+
+    def __init__(self, data=None, n=0):
+        self.data = np.zeros((n, 2)) if data is None else data
+
+    @property
+    def x(self):
+        return self.data[:, 0]
+
+    @property
+    def y(self):
+        return self.data[:, 1]
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        x, y = self.data[index]
+        return Vector2D(x.item(), y.item())
+
+    def __setitem__(self, index, vector):
+        self.data[index] = vector.x, vector.y
+
+    def set(self, x, y):
+        self.data[:, 0] = x
+        self.data[:, 1] = y
+        return self
+
+    def copy_from(self, vectors):
+        np.copyto(self.data, vectors.data)
+        return self
+
+    def add_scaled(self, vectors, scale):
+        self.data += vectors.data * (scale if np.ndim(scale) == 0 else np.reshape(scale, (-1, 1)))
+        return self
+
+    def copy(self):
+        return Vector2DArray(self.data.copy())
+
+    def __str__(self):
+        return str(self.data)
+
+def match_positions(ents, pos, prev_ents, prev_pos, snap):
+    if len(prev_ents) == 0: return np.zeros(len(ents), dtype=bool), np.zeros(0, dtype=np.int64)
+
+    order = np.argsort(prev_ents)
+    found = order[np.minimum(np.searchsorted(prev_ents, ents, sorter=order), len(order) - 1)]
+    known = (prev_ents[found] == ents) & (np.abs(pos - prev_pos[found]) <= snap).all(axis=1)
+    return known, found[known]
@@ -14,3 +14,75 @@ def aabb_aabb_collision(trans_a, col_a, trans_b, col_b, h):
     if pos_b.y + col_b.h < pos_a.y: return False
 
     return True
+
+def aabb_aabb_overlap(pos_a, size_a, pos_b, size_b):
+    return (
+        (pos_b[..., 0] <= pos_a[..., 0] + size_a[..., 0]) &
+        (pos_b[..., 0] + size_b[..., 0] >= pos_a[..., 0]) &
+        (pos_b[..., 1] <= pos_a[..., 1] + size_a[..., 1]) &
+        (pos_b[..., 1] + size_b[..., 1] >= pos_a[..., 1])
+    )
+
+def swept_bounds(pos, size, disp):
+    return pos - np.maximum(disp, 0), size + np.abs(disp)
+
+def swept_aabb(pos_a, size_a, disp_a, pos_b, size_b, disp_b):
+    start_a = pos_a - disp_a
+    start_b = pos_b - disp_b
+    disp    = disp_a - disp_b
+
+    enter = start_b - (start_a + size_a)
+    leave = start_b + size_b - start_a
+    ahead = disp > 0
+    still = disp == 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_enter = np.where(ahead, enter, leave) / disp
+        t_leave = np.where(ahead, leave, enter) / disp
+
+    overlap = (enter <= 0) & (leave >= 0)
+    t_enter = np.where(still, np.where(overlap, -np.inf, np.inf), t_enter).max(axis=-1)
+    t_leave = np.where(still, np.inf, t_leave).min(axis=-1)
+
+    hit = (t_enter <= t_leave) & (t_enter <= 1) & (t_leave >= 0)
+    return hit, np.clip(t_enter, 0, 1)
+
+class SweepAndPrune(object):
+    def __init__(self):
+        self.order = np.zeros(0, dtype=np.int64)
+
+    def sort(self, min_x):
+        if len(self.order) != len(min_x):
+            self.order = np.argsort(min_x, kind='stable')
+        else:
+            self.order = self.order[np.argsort(min_x[self.order], kind='stable')]
+        return self.order
+
+    def candidates(self, pos_a, size_a, pos_b, size_b):
+        order      = self.sort(pos_b[:, 0])
+        sorted_min = pos_b[order, 0]
+
+        lo     = np.searchsorted(sorted_min, pos_a[:, 0] - size_b[:, 0].max(), 'left')
+        hi     = np.searchsorted(sorted_min, pos_a[:, 0] + size_a[:, 0], 'right')
+        counts = hi - lo
+
+        a      = np.repeat(np.arange(len(pos_a)), counts)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        b      = order[starts + np.arange(counts.sum())]
+        return a, b
+
+    def query(self, pos_a, size_a, pos_b, size_b):
+        a, b = self.candidates(pos_a, size_a, pos_b, size_b)
+        hit  = aabb_aabb_overlap(pos_a[a], size_a[a], pos_b[b], size_b[b])
+        a, b = a[hit], b[hit]
+
+        pairs = np.lexsort((b, a))
+        return a[pairs], b[pairs]
+
+    def sweep(self, pos_a, size_a, disp_a, pos_b, size_b, disp_b):
+        a, b     = self.candidates(*swept_bounds(pos_a, size_a, disp_a), *swept_bounds(pos_b, size_b, disp_b))
+        hit, toi = swept_aabb(pos_a[a], size_a[a], disp_a[a], pos_b[b], size_b[b], disp_b[b])
+        a, b     = a[hit], b[hit]
+
+        pairs = np.lexsort((b, a))
+        return a[pairs], b[pairs], toi[hit][pairs]
@@ -0,0 +1,209 @@
+from multiprocessing import shared_memory
+
+from env import FlappyBatchEnv
+
+import multiprocessing as mp
+import numpy as np
+import argparse
+import time
+
+CLOSE = 0
+STEP  = 1
+RESET = 2
+
+class PoolLayout(object):
+    def __init__(self, n_workers, n_games, obs_size=5):
+        self.n_workers = n_workers
+        self.n_games   = n_games
+        self.fields    = (
+            ('commands', (n_workers, ), np.int64),
+            ('steps',    (n_workers, ), np.int64),
+            ('busy',     (n_workers, ), np.float64),
+            ('ring',     (n_workers, ), np.int64),
+            ('tail',     (1, ), np.int64),
+            ('actions',  (n_workers, n_games), bool),
+            ('rewards',  (n_workers, n_games), np.float32),
+            ('dones',    (n_workers, n_games), bool),
+            ('obs',      (n_workers, n_games, obs_size), np.float32)
+        )
+
+        self.offsets, self.nbytes = {}, 0
+        for name, shape, dtype in self.fields:
+            self.nbytes        += -self.nbytes % 64
+            self.offsets[name]  = self.nbytes
+            self.nbytes        += int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+    def views(self, buffer):
+        return { name: np.ndarray(shape, dtype, buffer, self.offsets[name]) for name, shape, dtype in self.fields }
+
+def _worker(index, name, layout, dt, seed, go, ready, lock):
+    shm   = shared_memory.SharedMemory(name=name)
+    views = layout.views(shm.buf)
+    env   = FlappyBatchEnv(layout.n_games, dt, seed)
+
+    commands, ring, tail = views['commands'], views['ring'], views['tail']
+    obs, rewards, dones  = views['obs'][index], views['rewards'][index], views['dones'][index]
+    actions              = views['actions'][index]
+
+    try:
+        while True:
+            go.acquire()
+            command = commands[index]
+            if command == CLOSE: break
+
+            start = time.perf_counter()
+            if command == RESET:
+                obs[:]     = env.reset()
+                rewards[:] = 0
+                dones[:]   = False
+            else:
+                obs[:], rewards[:], dones[:] = env.step(actions)
+                views['steps'][index] += layout.n_games
+            views['busy'][index] += time.perf_counter() - start
+
+            with lock:
+                ring[tail[0] % layout.n_workers] = index
+                tail[0]                         += 1
+            ready.release()
+    finally:
+        env.close()
+        del views, commands, ring, tail, obs, rewards, dones, actions
+        shm.close()
+
+class EnvPool(object):
+    def __init__(self, n_workers, games_per_worker, dt=1 / 60, seed=None, context=None):
+        ctx    = mp.get_context(context)
+        seeds  = np.random.SeedSequence(seed).spawn(n_workers)
+        layout = PoolLayout(n_workers, games_per_worker)
+
+        self.n_workers        = n_workers
+        self.games_per_worker = games_per_worker
+        self.layout           = layout
+        self.shm              = shared_memory.SharedMemory(create=True, size=layout.nbytes)
+        self.views            = layout.views(self.shm.buf)
+        self.ready            = ctx.Semaphore(0)
+        self.lock             = ctx.Lock()
+        self.go               = [ctx.Semaphore(0) for worker in range(n_workers)]
+        self.pending          = set()
+        self.head             = 0
+        self.started          = time.perf_counter()
+
+        for array in self.views.values():
+            array.fill(0)
+
+        self.workers = [
+            ctx.Process(target=_worker, args=(worker, self.shm.name, layout, dt, seeds[worker], self.go[worker], self.ready, self.lock), daemon=True)
+            for worker in range(n_workers)
+        ]
+        for process in self.workers:
+            process.start()
+
+    @property
+    def n_games(self):
+        return self.n_workers * self.games_per_worker
+
+    def _send(self, command, workers, actions=None):
+        workers = [int(worker) for worker in workers]
+        busy    = sorted(self.pending.intersection(workers))
+        if busy: raise RuntimeError(f'worker(s) {busy} have not returned their last step')
+
+        if actions is not None: self.views['actions'][workers] = actions
+        for worker in workers:
+            self.views['commands'][worker] = command
+            self.pending.add(worker)
+            self.go[worker].release()
+
+    def _recv(self, count):
+        ring, workers = self.views['ring'], []
+        for i in range(count):
+            while not self.ready.acquire(timeout=1):
+                dead = [worker for worker, process in enumerate(self.workers) if not process.is_alive()]
+                if dead: raise RuntimeError(f'env pool worker(s) {dead} exited')
+
+            worker     = int(ring[self.head % self.n_workers])
+            self.head += 1
+            self.pending.discard(worker)
+            workers.append(worker)
+        return workers
+
+    def reset(self):
+        self._send(RESET, range(self.n_workers))
+        self._recv(self.n_workers)
+        return self.views['obs'].reshape(self.n_games, -1)
+
+    def send(self, actions, workers=None):
+        workers = range(self.n_workers) if workers is None else workers
+        self._send(STEP, workers, np.asarray(actions, dtype=bool).reshape(len(workers), self.games_per_worker))
+
+    def recv(self, n_workers=None):
+        workers = np.array(sorted(self._recv(len(self.pending) if n_workers is None else n_workers)))
+        return workers, self.views['obs'][workers], self.views['rewards'][workers], self.views['dones'][workers]
+
+    def step(self, actions):
+        self.send(actions)
+        self._recv(self.n_workers)
+        return self.views['obs'].reshape(self.n_games, -1), self.views['rewards'].reshape(-1), self.views['dones'].reshape(-1)
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started
+        steps   = self.views['steps'].tolist()
+        busy    = self.views['busy'].tolist()
+
+        workers = [
+            { 'worker': worker, 'steps': steps[worker], 'busy': busy[worker], 'steps_per_second': steps[worker] / busy[worker] if busy[worker] else 0 }
+            for worker in range(self.n_workers)
+        ]
+        return { 'workers': workers, 'steps': sum(steps), 'elapsed': elapsed, 'steps_per_second': sum(steps) / elapsed }
+
+    def close(self):
+        if self.shm is None: return
+
+        if self.pending: self._recv(len(self.pending))
+        self._send(CLOSE, range(self.n_workers))
+        for process in self.workers:
+            process.join()
+
+        self.views = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+        self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--games', type=int, default=1024)
+    parser.add_argument('--steps', type=int, default=500)
+    parser.add_argument('--async-batch', type=int, default=0, metavar='WORKERS')
+    args = parser.parse_args()
+
+    for n_workers in args.workers:
+        with EnvPool(n_workers, args.games, seed=0) as pool:
+            pool.reset()
+            rng   = np.random.default_rng(0)
+            start = time.perf_counter()
+
+            if args.async_batch > 0:
+                pool.send(rng.random(pool.n_games) < 0.05)
+                for i in range(args.steps * n_workers // args.async_batch):
+                    workers, obs, rewards, dones = pool.recv(args.async_batch)
+                    pool.send(rng.random((len(workers), args.games)) < 0.05, workers)
+                pool.recv()
+            else:
+                for i in range(args.steps):
+                    pool.step(rng.random(pool.n_games) < 0.05)
+
+            elapsed = time.perf_counter() - start
+            stats   = pool.stats()
+
+        print(f'{n_workers} worker(s) {stats["steps"] / elapsed * 60:>16,.0f} env-steps per minute')
+        for worker in stats['workers']:
+            print(f'    worker {worker["worker"]:<3} {worker["steps_per_second"] * 60:>16,.0f} env-steps per busy minute')
@@ -0,0 +1,109 @@
+from collections import deque
+
+import numpy as np
+import threading
+import json
+import time
+
+class SystemRecord(object):
+    def __init__(self, name, capacity):
+        self.name     = name
+        self.times    = np.zeros(capacity)
+        self.calls    = np.zeros(capacity, dtype=np.int64)
+        self.entities = np.zeros(capacity, dtype=np.int64)
+        self.time     = 0
+        self.call     = 0
+        self.entity   = 0
+
+    def commit(self, slot):
+        self.times[slot]    = self.time
+        self.calls[slot]    = self.call
+        self.entities[slot] = self.entity
+        self.time, self.call, self.entity = 0, 0, 0
+
+class Profiler(object):
+    def __init__(self, capacity=600, trace_capacity=100_000):
+        self.capacity = capacity
+        self.frames   = 0
+        self.records  = {}
+        self.events   = deque(maxlen=trace_capacity)
+        self.origin   = time.perf_counter()
+        self._local   = threading.local()
+        self._lock    = threading.Lock()
+
+    def count(self, n):
+        counter = getattr(self._local, 'counter', None)
+        if counter is not None: counter[0] += n
+
+    def run(self, system, args, kwargs):
+        counter             = [0]
+        self._local.counter = counter
+
+        start = time.perf_counter()
+        try:
+            system.update(*args, **kwargs)
+        finally:
+            end                 = time.perf_counter()
+            self._local.counter = None
+            self._record(system, start, end, counter[0])
+
+    def _record(self, system, start, end, entities):
+        with self._lock:
+            if system not in self.records:
+                self.records[system] = SystemRecord(type(system).__name__, self.capacity)
+
+            record         = self.records[system]
+            record.time   += end - start
+            record.call   += 1
+            record.entity += entities
+
+            self.events.append((record.name, start, end, threading.get_ident(), self.frames, entities))
+
+    def end_frame(self):
+        with self._lock:
+            slot = self.frames % self.capacity
+            for record in self.records.values():
+                record.commit(slot)
+            self.frames += 1
+
+    def _window(self, values):
+        return values[:min(self.frames, self.capacity)]
+
+    def stats(self, percentiles=(50, 95, 99)):
+        stats = []
+        for record in self.records.values():
+            times = self._window(record.times)
+            if len(times) == 0: continue
+
+            stats.append({
+                'name':        record.name,
+                'percentiles': dict(zip(percentiles, np.percentile(times, percentiles) * 1000)),
+                'mean':        times.mean() * 1000,
+                'calls':       self._window(record.calls).mean(),
+                'entities':    self._window(record.entities).mean()
+            })
+
+        stats.sort(key=lambda stat: stat['mean'], reverse=True)
+        return stats
+
+    def top(self, n=5):
+        return self.stats()[:n]
+
+    def trace_events(self):
+        return [
+            {
+                'name': name,
+                'cat':  'system',
+                'ph':   'X',
+                'ts':   (start - self.origin) * 1e6,
+                'dur':  (end - start) * 1e6,
+                'pid':  0,
+                'tid':  tid,
+                'args': { 'frame': frame, 'entities': entities }
+            }
+            for name, start, end, tid, frame, entities in list(self.events)
+        ]
+
+    def dump_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump({ 'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms' }, f)
@@ -0,0 +1,289 @@
+from collections import OrderedDict
+from itertools import groupby
+
+from components import RenderableComponent
+from components import TransformComponent
+
+from maths import Vector2D
+
+import pygame as pg
+import numpy as np
+import bisect
+import os
+
+class RotationCache(object):
+    def __init__(self, step=1, budget=32 * 1024 * 1024):
+        self.step   = step
+        self.budget = budget
+        self.size   = 0
+        self.hits   = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def quantize(self, angle):
+        return round(angle / self.step) * self.step
+
+    def get(self, sprite, angle):
+        key   = sprite, self.quantize(angle)
+        entry = self._cache.get(key)
+
+        if entry is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        rotated      = pg.transform.rotate(sprite, key[1])
+        offset       = Vector2D(-0.5 * rotated.get_width(), 0.5 * rotated.get_height())
+        entry        = rotated, offset
+
+        self._cache[key] = entry
+        self.size       += rotated.get_width() * rotated.get_height() * rotated.get_bytesize()
+        self._evict()
+        return entry
+
+    def _evict(self):
+        while self.size > self.budget and len(self._cache) > 1:
+            key, (rotated, offset) = self._cache.popitem(last=False)
+            self.size -= rotated.get_width() * rotated.get_height() * rotated.get_bytesize()
+
+    def clear(self):
+        self._cache.clear()
+        self.size = 0
+
+class TextCache(object):
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.hits     = 0
+        self.misses   = 0
+        self._cache   = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key     = font, text, tuple(color), antialias
+        surface = self._cache.get(key)
+
+        if surface is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return surface
+
+        self.misses     += 1
+        surface          = font.render(text, antialias, color)
+        self._cache[key] = surface
+
+        if len(self._cache) > self.capacity: self._cache.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+class GlyphAtlas(object):
+    def __init__(self, font, color, chars='0123456789-', antialias=True):
+        self.glyphs = { char: font.render(char, antialias, color) for char in chars }
+        self.height = max(glyph.get_height() for glyph in self.glyphs.values())
+
+    def layout(self, text, center=None, topleft=(0, 0)):
+        glyphs = [self.glyphs[char] for char in text]
+        width  = sum(glyph.get_width() for glyph in glyphs)
+
+        if center is not None: x, y = center[0] - width // 2, center[1] - self.height // 2
+        else:                  x, y = topleft
+
+        rect, blits = pg.Rect(x, y, width, self.height), []
+        for glyph in glyphs:
+            blits.append((glyph, (x, y)))
+            x += glyph.get_width()
+
+        return blits, rect
+
+    def draw(self, surface, text, center=None, topleft=(0, 0)):
+        blits, rect = self.layout(text, center, topleft)
+        surface.blits(blits, doreturn=False)
+        return rect
+
+def composite(size, layers, background=None):
+    if background is None: surface = pg.Surface(size, pg.SRCALPHA)
+    else:                  surface = pg.Surface(size); surface.fill(background)
+
+    for sprite, pos in layers:
+        surface.blit(sprite, pos)
+    return surface
+
+class DirtyRects(object):
+    def __init__(self):
+        self.previous = {}
+        self.current  = {}
+        self.rects    = []
+
+    def begin(self):
+        self.current = {}
+        self.rects   = []
+
+    def mark(self, key, rect, sprite=None):
+        last = self.previous.get(key)
+        if last is None or last[0] != rect or last[1] is not sprite:
+            self.rects.append(rect)
+            if last is not None: self.rects.append(last[0])
+
+        self.current[key] = rect, sprite
+
+    def add(self, rect):
+        self.rects.append(rect)
+
+    def end(self):
+        for key, (rect, sprite) in self.previous.items():
+            if key not in self.current: self.rects.append(rect)
+
+        self.previous = self.current
+        return self.rects
+
+    def invalidate(self):
+        self.previous = {}
+
+class RenderQueue(object):
+    component_types = (TransformComponent, RenderableComponent)
+
+    def __init__(self):
+        self.keys     = []
+        self.entries  = []
+        self.index    = {}
+        self.version  = 0
+        self._counter = 0
+
+    def _insert(self, key, entry):
+        i = bisect.bisect(self.keys, key)
+        self.keys.insert(i, key)
+        self.entries.insert(i, entry)
+        self.index[entry[0]] = key
+        self.version += 1
+
+    def match(self, entity, components):
+        if TransformComponent not in components or RenderableComponent not in components:
+            self.discard(entity)
+            return
+
+        trans, rend = components[TransformComponent], components[RenderableComponent]
+        key         = self.index.get(entity)
+
+        if key is None:
+            self._counter += 1
+            key            = rend.depth, self._counter
+        else:
+            self.discard(entity)
+            key = rend.depth, key[1]
+
+        self._insert(key, (entity, trans, rend))
+
+    def discard(self, entity):
+        key = self.index.pop(entity, None)
+        if key is None: return
+
+        i = bisect.bisect_left(self.keys, key)
+        del self.keys[i]
+        del self.entries[i]
+        self.version += 1
+
+    def refresh(self):
+        if all(key[0] == entry[2].depth for key, entry in zip(self.keys, self.entries)): return
+
+        items         = sorted(((entry[2].depth, key[1]), entry) for key, entry in zip(self.keys, self.entries))
+        self.keys     = [key for key, entry in items]
+        self.entries  = [entry for key, entry in items]
+        self.index    = { entry[0]: key for key, entry in items }
+        self.version += 1
+
+    def layers(self):
+        for depth, items in groupby(zip(self.keys, self.entries), key=lambda item: item[0][0]):
+            yield depth, [entry for key, entry in items]
+
+    def clear(self):
+        self.keys.clear()
+        self.entries.clear()
+        self.index.clear()
+        self.version += 1
+
+    def __getstate__(self):
+        state = dict(vars(self))
+        state.update(keys=[], entries=[], index={})
+        return state
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+def headless_display():
+    if pg.display.get_surface() is not None: return pg.display.get_surface()
+
+    if not pg.display.get_init(): os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pg.display.init()
+    return pg.display.set_mode((1, 1))
+
+class RenderTarget(object):
+    def __init__(self, size):
+        headless_display()
+        self.size    = tuple(size)
+        self.surface = pg.Surface(self.size, 0, 32)
+
+    def pixels(self):
+        return pg.surfarray.pixels3d(self.surface)
+
+    def array(self):
+        return pg.surfarray.array3d(self.surface)
+
+class PixelObserver(object):
+    weights = (77, 150, 29)
+
+    def __init__(self, target, size=(84, 84), stack=4, smooth=False):
+        self.target = target
+        self.size   = tuple(size)
+        self.stack  = stack
+        self.smooth = smooth
+        self.count  = 0
+
+        w, h        = self.size
+        self.small  = pg.Surface(self.size, 0, 32)
+        self.frames = np.zeros((2 * stack, h, w), dtype=np.uint8)
+        self._gray  = np.zeros((h, w), dtype=np.uint16)
+        self._term  = np.zeros((h, w), dtype=np.uint16)
+
+    def reset(self):
+        self.frames[:] = 0
+        self.count     = 0
+
+    def _grayscale(self, out):
+        pixels = pg.surfarray.pixels3d(self.small)
+        gray   = self._gray.T
+
+        np.multiply(pixels[..., 0], self.weights[0], out=gray, dtype=np.uint16)
+        for channel in (1, 2):
+            np.multiply(pixels[..., channel], self.weights[channel], out=self._term.T, dtype=np.uint16)
+            np.add(gray, self._term.T, out=gray)
+        del pixels
+
+        np.right_shift(self._gray, 8, out=out, casting='unsafe')
+
+    def capture(self):
+        if self.smooth: pg.transform.smoothscale(self.target.surface, self.size, self.small)
+        else:           pg.transform.scale(self.target.surface, self.size, self.small)
+
+        slot = self.count % self.stack
+        self._grayscale(self.frames[slot])
+
+        if self.count == 0: self.frames[:] = self.frames[slot]
+        else:               self.frames[slot + self.stack] = self.frames[slot]
+        self.count += 1
+
+        return self.observation()
+
+    def observation(self, out=None):
+        start = self.count % self.stack
+        view  = self.frames[start:start + self.stack]
+        if out is None: return view
+
+        np.copyto(out, view)
+        return out
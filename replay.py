@@ -0,0 +1,119 @@
+from components import ScoreComponent
+
+from game import InputManager
+from game import PIPE_SPACING
+from game import build_world
+from game import DISPLAY
+
+from assets import AssetManager
+from ecs import World
+
+from array import array
+
+import pygame as pg
+import numpy as np
+import argparse
+import struct
+import time
+import zlib
+
+MAGIC  = b'FBREC003'
+HEADER = struct.Struct('<8sQQqQd?')
+
+class Recording(object):
+    def __init__(self, seed, dts=(), inputs=(), score=-1, pipes=1, pipe_spacing=PIPE_SPACING, swept=False):
+        self.seed         = seed
+        self.dts          = np.asarray(dts, dtype=np.float64)
+        self.inputs       = np.asarray(inputs, dtype=np.uint8)
+        self.score        = score
+        self.pipes        = pipes
+        self.pipe_spacing = pipe_spacing
+        self.swept        = swept
+
+    def __len__(self):
+        return len(self.dts)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.seed, len(self), self.score, self.pipes, self.pipe_spacing, self.swept))
+            f.write(zlib.compress(self.dts.tobytes() + self.inputs.tobytes(), 9))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        magic, seed, steps, score, pipes, pipe_spacing, swept = HEADER.unpack_from(data)
+        if magic != MAGIC: raise ValueError(f'{path} is not an input recording')
+
+        payload = zlib.decompress(data[HEADER.size:])
+        dts     = np.frombuffer(payload, dtype=np.float64, count=steps)
+        inputs  = np.frombuffer(payload, dtype=np.uint8, count=steps, offset=8 * steps)
+        return cls(seed, dts, inputs, score, pipes, pipe_spacing, swept)
+
+class Recorder(object):
+    def __init__(self, inputs, seed, dt=None, pipes=1, pipe_spacing=PIPE_SPACING, swept=False):
+        self.inputs       = inputs
+        self.seed         = seed
+        self.dt           = dt
+        self.pipes        = pipes
+        self.pipe_spacing = pipe_spacing
+        self.swept        = swept
+        self._dts         = array('d')
+        self._flags       = array('B')
+
+    def record(self, dt=None):
+        self._dts.append(self.dt if dt is None else dt)
+        self._flags.append(self.inputs.flags())
+        self.inputs.consume()
+
+    def recording(self, score=-1):
+        return Recording(self.seed, self._dts, self._flags, score, self.pipes, self.pipe_spacing, self.swept)
+
+def final_score(world):
+    scores = world.get_component(ScoreComponent)
+    return scores[0][1].value if scores else -1
+
+def replay(recording, columnar=False, assets=None):
+    world  = World(columnar=columnar)
+    assets = assets if assets is not None else AssetManager()
+    build_world(
+        world,
+        pg.Surface(DISPLAY),
+        assets,
+        render       = None,
+        rng          = np.random.RandomState(recording.seed),
+        pipes        = recording.pipes,
+        pipe_spacing = recording.pipe_spacing,
+        swept        = recording.swept
+    )
+
+    inputs = InputManager()
+    start  = time.perf_counter()
+    for dt, flags in zip(recording.dts.tolist(), recording.inputs.tolist()):
+        inputs.set_flags(flags)
+        world.step('simulation', dt=dt, inputs=inputs)
+
+    return world, time.perf_counter() - start
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('recording')
+    parser.add_argument('--columnar', action='store_true')
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    recording = Recording.load(args.recording)
+    assets    = AssetManager()
+
+    best = float('inf')
+    for i in range(args.repeat):
+        world, elapsed = replay(recording, args.columnar, assets)
+        best           = min(best, elapsed)
+
+    score = final_score(world)
+    match = recording.score < 0 or score == recording.score
+
+    print(f'{len(recording):,} steps  seed {recording.seed}  {recording.pipes} pipe pair(s){"  swept" if recording.swept else ""}  score {score} (recorded {recording.score}) {"OK" if match else "MISMATCH"}')
+    print(f'{len(recording) / best:,.0f} simulation steps per second')
+    raise SystemExit(0 if match else 1)
@@ -1,58 +1,50 @@
 import pygame as pg
 import numpy as np
+import argparse
 import time
 
-from components import SpriteSheetSequenceComponent
-from components import RectangleColliderComponent
-from components import ResetPositionComponent
-from components import ObstacleTagComponent
-from components import ScrollableComponent
-from components import RenderableComponent
-from components import TransformComponent
-from components import RigidBodyComponent
-from components import PlayerTagComponent
-from components import PipeStateComponent
-from components import PipeTagComponent
-from components import ScoreComponent
-from components import FlapComponent
-
-from systems import SpriteSheetSequenceSystem
-from systems import ResetPipeOffsetSystem
-from systems import ResetPipeStateSystem
-from systems import ResetPositionSystem
-from systems import PlayerStateSystem
+from systems import BakedRenderableSystem
+from systems import ProfilerOverlaySystem
 from systems import ScoreRenderSystem
-from systems import ScrollableSystem
 from systems import RenderableSystem
-from systems import CollisionSystem
-from systems import MovementSystem
-from systems import GravitySystem
-from systems import ScoreSystem
-from systems import FlapSystem
-from systems import TiltSystem
 
-from ecs import World
-
-import os
+from game import InputManager
+from game import PIPE_SPACING
+from game import build_world
+from game import DISPLAY
 
-class InputManager(object):
-    def __init__(self):
-        self.KEYS = { 'SPACE_BAR': False }
+from replay import final_score
+from replay import Recorder
 
-    def update(self, events):
-        self.KEYS['SPACE_BAR'] = False
+from render import GlyphAtlas
+from render import TextCache
 
-        for event in events:
-            if event.type == pg.KEYDOWN:
-                if event.key == pg.K_SPACE:
-                    self.KEYS['SPACE_BAR'] = True
+from assets import AssetManager
+from loop import FixedTimestepLoop
+from ecs import World
 
-    def __getitem__(self, index):
-        if index not in self.KEYS: return False
-        return self.KEYS[index]
+import os
 
-display = (640, 980)
-fps_cap = 60
+parser = argparse.ArgumentParser()
+parser.add_argument('--render', choices=('full', 'baked'), default='full')
+parser.add_argument('--compare', type=int, default=0, metavar='FRAMES')
+parser.add_argument('--asset-cache', default=None, metavar='PATH')
+parser.add_argument('--sim-rate', type=float, default=60)
+parser.add_argument('--render-rate', type=float, default=60)
+parser.add_argument('--no-interpolation', action='store_true')
+parser.add_argument('--headless', type=int, default=0, metavar='STEPS')
+parser.add_argument('--profile', action='store_true')
+parser.add_argument('--trace', default=None, metavar='PATH')
+parser.add_argument('--seed', type=int, default=None)
+parser.add_argument('--record', default=None, metavar='PATH')
+parser.add_argument('--pipes', type=int, default=1)
+parser.add_argument('--pipe-spacing', type=float, default=PIPE_SPACING)
+parser.add_argument('--swept', action='store_true')
+parser.add_argument('--columnar', action='store_true')
+args = parser.parse_args()
+
+display = DISPLAY
+fps_cap = args.render_rate
 
 os.environ['SDL_VIDEO_CENTERED'] = '1'
 pg.init()
@@ -61,172 +53,89 @@ window     = pg.display.set_mode(display)
 clock      = pg.time.Clock()
 font       = pg.font.Font(None , 30)
 score_font = pg.font.Font(None, 50)
+text_cache = TextCache()
+fps_digits = GlyphAtlas(font, (255, 255, 255))
 inputs     = InputManager()
+assets     = AssetManager(cache_path=args.asset_cache)
 
-world = World()
-
-gravity_system         = GravitySystem(force=-900)
-flap_system            = FlapSystem()
-movement_system        = MovementSystem()
-tilt_system            = TiltSystem()
-scrollable_system      = ScrollableSystem()
-collision_system       = CollisionSystem(window)
-score_system           = ScoreSystem()
-sprite_sheet_system    = SpriteSheetSequenceSystem()
-renderable_system      = RenderableSystem(window)
-scorerender_system     = ScoreRenderSystem(window, score_font)
-resetposition_system   = ResetPositionSystem(window)
-resetpipeoffset_system = ResetPipeOffsetSystem((0, 470))
-playerstate_system     = PlayerStateSystem(ScrollableComponent(-150, 0), pg.transform.scale(pg.image.load('./res/flappy_dead.png').convert_alpha(), (100, 80)))
-resetpipestate_system  = ResetPipeStateSystem()
-
-world.add_system(gravity_system, priority=8)
-world.add_system(flap_system, priority=7)
-world.add_system(movement_system, priority=6)
-world.add_system(tilt_system, priority=5)
-world.add_system(scrollable_system, priority=4)
-world.add_system(collision_system, priority=3)
-world.add_system(score_system, priority=2)
-world.add_system(sprite_sheet_system, priority=1)
-world.add_system(renderable_system, priority=0)
-world.add_system(scorerender_system, priority=-1)
-world.add_system(resetposition_system, priority=-2)
-world.add_system(resetpipeoffset_system, priority=-3)
-world.add_system(playerstate_system, priority=-4)
-world.add_system(resetpipestate_system, priority=-5)
-
-player = world.create_entity(
-    TransformComponent(180, 490, rot=45),
-    RenderableComponent(sprite=None, x=-50, y=-40, size=None, depth=10),
-    SpriteSheetSequenceComponent(
-        spritesheet = pg.image.load('./res/flappy.png').convert_alpha(),
-        size        = (100, 80),
-        n_row       = 1,
-        n_col       = 4,
-        duration    = 0.1
-    ),
-    RigidBodyComponent(),
-    FlapComponent(force=400),
-    RectangleColliderComponent(x=-40, y=-40, w=80, h=60),
-    PlayerTagComponent(),
-    ScoreComponent()
-)
+seed = args.seed
+if seed is None and args.record is not None: seed = int(np.random.randint(2 ** 31))
+rng  = np.random.RandomState(seed) if seed is not None else None
 
-sky = world.create_entity(
-    TransformComponent(0, 980),
-    RenderableComponent(
-        sprite = pg.image.load('./res/sky.jpg'),
-        x      = 0,
-        y      = 0,
-        size   = (640, 980),
-        depth  = 0
-    )
-)
+world = World(columnar=args.columnar)
+build_world(world, window, assets, score_font, render=args.render, rng=rng, pipes=args.pipes, pipe_spacing=args.pipe_spacing, swept=args.swept)
+assets.release_decoded()
 
-clouds = [
-    world.create_entity(
-        TransformComponent(i * 640, 980),
-        RenderableComponent(
-            sprite = pg.image.load('./res/clouds.png').convert_alpha(),
-            x      = 0,
-            y      = 0,
-            size   = (640, 980),
-            depth  = 1
-        ),
-        ScrollableComponent(-12, 0),
-        ResetPositionComponent(640, 980, -640)
-    )
-    for i in range(2)
-]
-
-buildings = [
-    world.create_entity(
-        TransformComponent(i * 640, 980),
-        RenderableComponent(
-            sprite = pg.image.load('./res/buildings.png').convert_alpha(),
-            x      = 0,
-            y      = 0,
-            size   = (640, 980),
-            depth  = 2
-        ),
-        ScrollableComponent(-16, 0),
-        ResetPositionComponent(640, 980, -640)
-    )
-    for i in range(2)
-]
-
-trees = [
-    world.create_entity(
-        TransformComponent(i * 640, 980),
-        RenderableComponent(
-            sprite = pg.image.load('./res/trees.png').convert_alpha(),
-            x      = 0,
-            y      = 0,
-            size   = (640, 980),
-            depth  = 3
-        ),
-        ScrollableComponent(-22, 0),
-        ResetPositionComponent(640, 980, -640)
-    )
-    for i in range(2)
-]
-
-floor = [
-    world.create_entity(
-        TransformComponent(i * 640, 980),
-        RenderableComponent(
-            sprite = pg.image.load('./res/floor.png').convert_alpha(),
-            x      = 0,
-            y      = 0,
-            size   = (640, 980),
-            depth  = 5
-        ),
-        ScrollableComponent(-150, 0),
-        ResetPositionComponent(640, 980, -640),
-        RectangleColliderComponent(x=0, y=980 - 190, w=640, h=190),
-        ObstacleTagComponent()
-    )
-    for i in range(2)
-]
-
-pipe_gap        = 200
-pipe_pos_x      = 709
-pipe_down_pos_y = -396.5 + 260
-pipe_up_pos_y   = pipe_down_pos_y + 793
-
-pipe_up = world.create_entity(
-    TransformComponent(pipe_pos_x, pipe_up_pos_y + pipe_gap),
-    RenderableComponent(
-        sprite = pg.image.load('./res/pipe_up.png').convert_alpha(),
-        x      = -69,
-        y      = -396.5,
-        size   = (138, 793),
-        depth  = 4
-    ),
-    ScrollableComponent(-150, 0),
-    ResetPositionComponent(pipe_pos_x, pipe_up_pos_y + pipe_gap, -69),
-    RectangleColliderComponent(x=-69, y=-396.5, w=138, h=793),
-    ObstacleTagComponent(),
-    PipeTagComponent()
-)
+renderable_system  = world.get_system(BakedRenderableSystem if args.render == 'baked' else RenderableSystem)
+scorerender_system = world.get_system(ScoreRenderSystem)
+
+if args.profile or args.trace is not None:
+    world.enable_profiling()
+    if args.profile: world.add_system(ProfilerOverlaySystem(window, font), priority=-6)
 
-pipe_down = world.create_entity(
-    TransformComponent(pipe_pos_x, pipe_down_pos_y),
-    RenderableComponent(
-        sprite = pg.image.load('./res/pipe_down.png').convert_alpha(),
-        x      = -69,
-        y      = -396.5,
-        size   = (138, 793),
-        depth  = 4
-    ),
-    ScrollableComponent(-150, 0),
-    ResetPositionComponent(pipe_pos_x, pipe_down_pos_y, -69),
-    RectangleColliderComponent(x=-69, y=-396.5, w=138, h=793),
-    ObstacleTagComponent(),
-    PipeTagComponent(),
-    PipeStateComponent()
+assets.save()
+
+recorder = Recorder(inputs, seed, 1 / args.sim_rate, args.pipes, args.pipe_spacing, args.swept) if args.record is not None else None
+loop     = FixedTimestepLoop(
+    world,
+    rate        = args.sim_rate,
+    interpolate = not args.no_interpolation,
+    on_step     = recorder.record if recorder is not None else inputs.consume
 )
 
+def report():
+    if world.profiler is None: return
+
+    for stat in world.profiler.stats():
+        p50, p95, p99 = stat['percentiles'].values()
+        print(f'{stat["name"]:<26} p50 {p50:.3f} ms  p95 {p95:.3f} ms  p99 {p99:.3f} ms  {stat["entities"]:.0f} entities')
+
+    if args.trace is not None: world.profiler.dump_trace(args.trace)
+
+def save_recording():
+    if recorder is not None: recorder.recording(final_score(world)).save(args.record)
+
+if args.headless > 0:
+    print(f'{loop.run(args.headless, inputs=inputs):,.0f} simulation steps per second')
+    report()
+    save_recording()
+    world.close()
+    raise SystemExit
+
+def frame(dt):
+    baked = isinstance(renderable_system, BakedRenderableSystem)
+
+    if not baked: window.fill((0, 0, 0))
+    loop.advance(dt, inputs=inputs)
+    fps_rect = window.blit(text_cache.render(font, 'FPS: ', (255, 255, 255)), (10, 10))
+    fps_rect = fps_rect.union(fps_digits.draw(window, f'{int(clock.get_fps())}', topleft=fps_rect.topright))
+
+    overlay = world.get_system(ProfilerOverlaySystem)
+    rects   = overlay.rects if overlay is not None else []
+
+    if baked: pg.display.update(renderable_system.dirty_rects + scorerender_system.rects + rects + [fps_rect])
+    else:     pg.display.flip()
+
+if args.compare > 0:
+    for system_type in (RenderableSystem, BakedRenderableSystem):
+        world.remove_system(type(renderable_system))
+        renderable_system = system_type(window)
+        world.add_system(renderable_system, priority=0)
+
+        times = []
+        for i in range(args.compare):
+            pg.event.pump()
+            start = time.perf_counter()
+            frame(1 / fps_cap)
+            times.append(time.perf_counter() - start)
+
+        times = np.array(times) * 1000
+        print(f'{system_type.__name__:<24} mean {times.mean():.2f} ms  p95 {np.percentile(times, 95):.2f} ms')
+
+    save_recording()
+    world.close()
+    raise SystemExit
+
 last_time = time.time()
 dt        = 0
 
@@ -242,9 +151,10 @@ while running:
             running = False
     inputs.update(events)
 
-    window.fill((0, 0, 0))
-    world.update(dt=dt, inputs=inputs)
-    window.blit(font.render(f'FPS: {int(clock.get_fps())}', True, (255, 255, 255)), (10, 10))
-    pg.display.flip()
+    frame(dt)
 
     clock.tick(fps_cap)
+
+report()
+save_recording()
+world.close()
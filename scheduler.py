@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+def access(system):
+    reads  = getattr(system, 'reads', None)
+    writes = getattr(system, 'writes', None)
+    if reads is None and writes is None: return None
+    return set(reads or ()), set(writes or ())
+
+def conflicts(system_a, system_b):
+    access_a, access_b = access(system_a), access(system_b)
+    if access_a is None or access_b is None: return True
+
+    reads_a, writes_a = access_a
+    reads_b, writes_b = access_b
+    return bool(writes_a & (reads_b | writes_b) or writes_b & reads_a)
+
+class Scheduler(object):
+    def __init__(self, workers=1, runner=None):
+        self.workers   = workers
+        self.executor  = ThreadPoolExecutor(workers) if workers > 1 else None
+        self.systems   = []
+        self.deps      = {}
+        self.stages    = []
+        self.durations = {}
+        self._builds   = {}
+        self.runner    = runner
+
+    def build(self, systems):
+        key = tuple(systems)
+        if key in self._builds:
+            self.systems, self.deps, self.stages = self._builds[key]
+            return self.stages
+
+        deps, levels = {}, {}
+        for i, system in enumerate(systems):
+            deps[system]   = [other for other in systems[:i] if conflicts(other, system)]
+            levels[system] = 1 + max((levels[dep] for dep in deps[system]), default=-1)
+
+        stages = [[] for _ in range(1 + max(levels.values(), default=-1))]
+        for system in systems:
+            stages[levels[system]].append(system)
+
+        self.systems      = list(systems)
+        self.deps         = deps
+        self.stages       = stages
+        self._builds[key] = self.systems, deps, stages
+        return stages
+
+    def run(self, systems, *args, **kwargs):
+        for stage in self.build(systems):
+            if self.executor is None or len(stage) == 1:
+                for system in stage:
+                    self.runner(system, args, kwargs)
+            else:
+                futures = [self.executor.submit(self.runner, system, args, kwargs) for system in stage]
+                for future in futures:
+                    future.result()
+
+    def critical_path(self):
+        cost, prev = {}, {}
+        for system in self.systems:
+            best         = max(self.deps[system], key=lambda dep: cost[dep], default=None)
+            prev[system] = best
+            cost[system] = self.durations.get(system, 0) + (cost[best] if best is not None else 0)
+
+        path = []
+        node = max(self.systems, key=lambda system: cost[system], default=None)
+        while node is not None:
+            path.append(node)
+            node = prev[node]
+
+        return path[::-1], cost[path[0]] if path else 0
+
+    def close(self):
+        if self.executor is not None: self.executor.shutdown()
+        self.executor = None
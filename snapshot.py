@@ -0,0 +1,260 @@
+from storage import column_schema
+from storage import Location
+from storage import Table
+
+from maths import Vector2D
+
+from assets import frame_key
+from assets import frame_set
+
+import pygame as pg
+import numpy as np
+import pickle
+import random
+import struct
+import mmap
+import io
+
+MAGIC = b'FBSNAP01'
+ALIGN = 64
+PLAIN = { int, float, bool, str, bytes, tuple, list, dict, set, frozenset, type, type(None) }
+
+class SnapshotPickler(pickle.Pickler):
+    def __init__(self, file, assets=None, world=None, buffer_callback=None):
+        super().__init__(file, protocol=5, buffer_callback=buffer_callback)
+        self.assets = assets
+        self.world  = world
+        self.refs   = []
+
+    def persistent_id(self, obj):
+        if type(obj) in PLAIN: return None
+        if self.world is not None and obj is self.world: return ('world', )
+
+        if isinstance(obj, pg.Surface):
+            key = self.assets.key_of(obj) if self.assets is not None else None
+            if key is not None: return 'asset', key
+
+            key = frame_key(obj)
+            if key is not None: return 'frame', key
+
+        elif not isinstance(obj, pg.font.Font):
+            return None
+
+        self.refs.append(obj)
+        return 'ref', len(self.refs) - 1
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, refs=(), assets=None, buffers=None):
+        super().__init__(file, buffers=buffers)
+        self.refs   = refs
+        self.assets = assets
+
+    def persistent_load(self, pid):
+        kind = pid[0]
+        if kind == 'world': return None
+        if kind == 'frame': return frame_set(pid[1][0])[pid[1][1]]
+
+        if kind == 'asset':
+            if self.assets is None: raise pickle.UnpicklingError(f'asset {pid[1]} needs an AssetManager to restore')
+            return self.assets.get(pid[1])
+
+        if pid[1] >= len(self.refs): raise pickle.UnpicklingError('snapshot references an object that only exists in the process that took it')
+        return self.refs[pid[1]]
+
+class Snapshot(object):
+    def __init__(self, header, buffers, refs=()):
+        self.header  = header
+        self.buffers = buffers
+        self.refs    = list(refs)
+
+    @property
+    def nbytes(self):
+        return len(self.header) + sum(memoryview(buffer).nbytes for buffer in self.buffers)
+
+    @classmethod
+    def dumps(cls, obj, assets=None, world=None):
+        buffers = []
+        file    = io.BytesIO()
+        pickler = SnapshotPickler(file, assets, world, buffer_callback=buffers.append)
+        pickler.dump(obj)
+        return cls(file.getvalue(), [buffer.raw() for buffer in buffers], pickler.refs)
+
+    def loads(self, assets=None):
+        return SnapshotUnpickler(io.BytesIO(self.header), self.refs, assets, self.buffers).load()
+
+    def save(self, path):
+        if self.refs: raise ValueError('snapshot references surfaces without an asset id and cannot be saved')
+
+        chunks  = [memoryview(self.header), *(memoryview(buffer) for buffer in self.buffers)]
+        lengths = [chunk.nbytes for chunk in chunks]
+
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack(f'<I{len(lengths)}Q', len(lengths), *lengths))
+            for chunk in chunks:
+                f.write(bytes(-f.tell() % ALIGN))
+                f.write(chunk)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(mapped)
+        if view[:len(MAGIC)] != MAGIC: raise ValueError(f'{path} is not a world snapshot')
+
+        offset  = len(MAGIC)
+        count,  = struct.unpack_from('<I', mapped, offset)
+        lengths = struct.unpack_from(f'<{count}Q', mapped, offset + 4)
+        offset += 4 + 8 * count
+
+        chunks = []
+        for length in lengths:
+            offset += -offset % ALIGN
+            chunks.append(view[offset:offset + length])
+            offset += length
+
+        return cls(chunks[0], chunks[1:])
+
+def pack(component_type, instances):
+    schema = column_schema(component_type)
+    names  = { name for name, width, dtype in schema }
+    if not schema or any(vars(instance).keys() != names for instance in instances): return None
+
+    columns = {}
+    for name, width, dtype in schema:
+        values = [getattr(instance, name) for instance in instances]
+        if width == 2: columns[name] = np.array([(value.x, value.y) for value in values], dtype=dtype).reshape(-1, 2)
+        else:          columns[name] = np.array([np.nan if value is None else value for value in values], dtype=dtype)
+    return columns
+
+def unpack(component_type, columns):
+    names, fields = [], []
+    for name, width, dtype in column_schema(component_type):
+        values = columns[name].tolist()
+        if   width == 2:        values = [Vector2D(x, y) for x, y in values]
+        elif dtype.kind == 'f': values = [None if value != value else value for value in values]
+        names.append(name)
+        fields.append(values)
+
+    instances = []
+    for row in zip(*fields):
+        instance = object.__new__(component_type)
+        vars(instance).update(zip(names, row))
+        instances.append(instance)
+    return instances
+
+def rng_state(rng):
+    if isinstance(rng, np.random.Generator):   return rng.bit_generator.state
+    if isinstance(rng, np.random.RandomState): return rng.get_state()
+    return None
+
+def set_rng_state(rng, state):
+    if isinstance(rng, np.random.Generator): rng.bit_generator.state = state
+    else:                                    rng.set_state(state)
+
+def capture(world, assets=None):
+    storage, entity_db = world._storage, world._entities
+
+    tables = []
+    if storage is not None:
+        for types, table in storage.tables.items():
+            size = table.size
+            if size == 0: continue
+            tables.append((types, table.entities[:size].copy(), { key: array[:size].copy() for key, array in table.arrays.items() }))
+
+    packed, objects = [], {}
+    for component_type, entities in world._components.items():
+        if storage is not None and storage.supports(component_type): continue
+
+        entities  = sorted(entities)
+        instances = [entity_db[entity][component_type] for entity in entities]
+        columns   = pack(component_type, instances)
+
+        if columns is not None: packed.append((component_type, np.array(entities, dtype=np.int64), columns))
+        else:                   objects[component_type] = entities, instances
+
+    signatures, order = {}, []
+    for entity, components in entity_db.items():
+        order.append(signatures.setdefault(tuple(components), len(signatures)))
+
+    state = {
+        'generations':    np.array(entity_db.generations, dtype=np.int64),
+        'free':           np.array(entity_db.free, dtype=np.int64),
+        'dead_entities':  sorted(world._dead_entities),
+        'commands':       list(world.commands.commands),
+        'entities':       np.array(list(entity_db), dtype=np.int64),
+        'order':          np.array(order, dtype=np.int64),
+        'signatures':     list(signatures),
+        'packed':         packed,
+        'objects':        objects,
+        'tables':         tables,
+        'random':         random.getstate(),
+        'np_random':      np.random.get_state(),
+        'system_rngs':    [rng_state(getattr(system, 'rng', None)) for system in world._systems]
+    }
+
+    return Snapshot.dumps(state, assets)
+
+def restore(world, snapshot, assets=None):
+    state   = snapshot.loads(assets)
+    storage = world._storage
+
+    world._dead_entities    = set(state['dead_entities'])
+    world.commands.commands = state['commands']
+    world._components.clear()
+    world._entities.reset(state['generations'].tolist(), state['free'].tolist())
+
+    if storage is not None:
+        storage.clear()
+
+        for types, entities, arrays in state['tables']:
+            size  = len(entities)
+            table = Table(types, capacity=max(16, size))
+
+            table.entities[:size] = entities
+            for key, array in arrays.items():
+                table.arrays[key][:size] = array
+
+            table.size      = size
+            table.locations = [Location(table, row) for row in range(size)]
+
+            storage.tables[types] = table
+            storage.locations.update(zip(entities.tolist(), table.locations))
+
+    instances = {}
+    for component_type, entities, columns in state['packed']:
+        instances[component_type] = dict(zip(entities.tolist(), unpack(component_type, columns)))
+    for component_type, (entities, objects) in state['objects'].items():
+        instances[component_type] = dict(zip(entities, objects))
+
+    entity_db, component_db, signatures = world._entities, world._components, state['signatures']
+    groups = [[] for signature in signatures]
+    masks  = [world.component_mask(signature) for signature in signatures]
+
+    for entity, signature in zip(state['entities'].tolist(), state['order'].tolist()):
+        components = {}
+        for component_type in signatures[signature]:
+            if component_type in instances: components[component_type] = instances[component_type][entity]
+            else:                           components[component_type] = storage._view(component_type)(storage.locations[entity])
+
+        entity_db.place(entity, components, masks[signature])
+        groups[signature].append(entity)
+
+    for component_types, entities in zip(signatures, groups):
+        for component_type in component_types:
+            component_db.setdefault(component_type, set()).update(entities)
+
+    world.clear_cache()
+    for observer in world._observers:
+        observer.clear()
+        for entity, components in entity_db.items():
+            observer.match(entity, components)
+
+    random.setstate(state['random'])
+    np.random.set_state(state['np_random'])
+    for system, system_rng in zip(world._systems, state['system_rngs']):
+        if system_rng is not None: set_rng_state(system.rng, system_rng)
+
+def copy_systems(systems, world):
+    return Snapshot.dumps(list(systems), world=world).loads()
@@ -0,0 +1,271 @@
+import numpy as np
+
+from maths import Vector2D
+
+_schemas = {}
+
+def column_schema(component_type):
+    if component_type in _schemas: return _schemas[component_type]
+
+    schema = []
+    for column in getattr(component_type, 'columns', ()):
+        name, width = column[0], column[1]
+        dtype       = column[2] if len(column) > 2 else np.float64
+        schema.append((name, width, np.dtype(dtype)))
+
+    _schemas[component_type] = tuple(schema)
+    return _schemas[component_type]
+
+class Location(object):
+    __slots__ = ('table', 'row')
+
+    def __init__(self, table=None, row=-1):
+        self.table = table
+        self.row   = row
+
+class ColumnVector2D(Vector2D):
+    __slots__ = ('_key', '_location')
+
+    def __init__(self, key, location):
+        self._key      = key
+        self._location = location
+
+    @property
+    def x(self):
+        loc = self._location
+        return loc.table.arrays[self._key][loc.row, 0].item()
+
+    @x.setter
+    def x(self, value):
+        loc = self._location
+        loc.table.arrays[self._key][loc.row, 0] = value
+
+    @property
+    def y(self):
+        loc = self._location
+        return loc.table.arrays[self._key][loc.row, 1].item()
+
+    @y.setter
+    def y(self, value):
+        loc = self._location
+        loc.table.arrays[self._key][loc.row, 1] = value
+
+def _vector_property(key):
+    def getter(self):
+        return ColumnVector2D(key, self._location)
+
+    def setter(self, vector):
+        loc = self._location
+        loc.table.arrays[key][loc.row] = (vector.x, vector.y)
+
+    return property(getter, setter)
+
+def _scalar_property(key, nullable):
+    def getter(self):
+        loc   = self._location
+        value = loc.table.arrays[key][loc.row].item()
+        if nullable and value != value: return None
+        return value
+
+    def setter(self, value):
+        loc = self._location
+        if value is None: value = np.nan
+        loc.table.arrays[key][loc.row] = value
+
+    return property(getter, setter)
+
+def _column_value(value, width):
+    if width == 2:      return value.x, value.y
+    if value is None:   return np.nan
+    return value
+
+def make_view(component_type):
+    attrs = { '__slots__': ('_location',) }
+    for name, width, dtype in column_schema(component_type):
+        key = (component_type, name)
+        if width == 2: attrs[name] = _vector_property(key)
+        else:          attrs[name] = _scalar_property(key, dtype.kind == 'f')
+
+    for name, attr in vars(component_type).items():
+        if isinstance(attr, property) and name not in attrs: attrs[name] = attr
+
+    def __init__(self, location):
+        self._location = location
+
+    attrs['__init__'] = __init__
+    return type(f'{component_type.__name__}View', (object,), attrs)
+
+class Table(object):
+    def __init__(self, types, capacity=16):
+        self.types     = types
+        self.size      = 0
+        self.capacity  = capacity
+        self.entities  = np.zeros(capacity, dtype=np.int64)
+        self.locations = []
+        self.arrays    = {}
+
+        for component_type in types:
+            for name, width, dtype in column_schema(component_type):
+                shape = (capacity, width) if width > 1 else (capacity,)
+                self.arrays[(component_type, name)] = np.zeros(shape, dtype=dtype)
+
+    def _grow(self):
+        self.capacity *= 2
+
+        entities             = np.zeros(self.capacity, dtype=np.int64)
+        entities[:self.size] = self.entities[:self.size]
+        self.entities        = entities
+
+        for key, array in self.arrays.items():
+            grown             = np.zeros((self.capacity, *array.shape[1:]), dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            self.arrays[key]  = grown
+
+    def add_row(self, entity, location):
+        if self.size == self.capacity: self._grow()
+
+        row                = self.size
+        self.entities[row] = entity
+        self.locations.append(location)
+        self.size         += 1
+        return row
+
+    def add_rows(self, entities):
+        start = self.size
+        end   = start + len(entities)
+        while self.capacity < end: self._grow()
+
+        self.entities[start:end] = entities
+        self.locations.extend(Location(self, row) for row in range(start, end))
+        self.size = end
+        return start
+
+    def remove_row(self, row):
+        last = self.size - 1
+
+        if row != last:
+            self.entities[row] = self.entities[last]
+            for array in self.arrays.values():
+                array[row] = array[last]
+
+            moved               = self.locations[last]
+            moved.row           = row
+            self.locations[row] = moved
+
+        self.locations.pop()
+        self.size -= 1
+
+    def columns(self, component_type):
+        size = self.size
+        return {
+            name: self.arrays[(component_type, name)][:size]
+            for name, width, dtype in column_schema(component_type)
+        }
+
+class ColumnStorage(object):
+    def __init__(self):
+        self.tables    = {}
+        self.locations = {}
+        self.views     = {}
+        self._schemas  = {}
+
+    def supports(self, component_type):
+        if component_type not in self._schemas:
+            self._schemas[component_type] = len(column_schema(component_type)) > 0
+        return self._schemas[component_type]
+
+    def _table(self, types):
+        if types not in self.tables:
+            self.tables[types] = Table(types)
+        return self.tables[types]
+
+    def _move(self, entity, location, types):
+        table = self._table(types)
+        row   = table.add_row(entity, location)
+
+        if location.table is not None:
+            old, old_row = location.table, location.row
+            for key, array in table.arrays.items():
+                if key in old.arrays:
+                    array[row] = old.arrays[key][old_row]
+            old.remove_row(old_row)
+
+        location.table = table
+        location.row   = row
+
+    def _view(self, component_type):
+        if component_type not in self.views:
+            self.views[component_type] = make_view(component_type)
+        return self.views[component_type]
+
+    def _write(self, location, component_instance):
+        component_type = type(component_instance)
+        table, row     = location.table, location.row
+
+        for name, width, dtype in column_schema(component_type):
+            table.arrays[(component_type, name)][row] = _column_value(getattr(component_instance, name), width)
+
+    def add(self, entity, component_instance):
+        return self.assign(entity, [component_instance])[type(component_instance)]
+
+    def assign(self, entity, component_instances, removed_types=()):
+        if entity not in self.locations:
+            self.locations[entity] = Location()
+
+        location = self.locations[entity]
+        old      = location.table.types if location.table is not None else frozenset()
+        types    = (old - set(removed_types)) | { type(component) for component in component_instances }
+
+        if not types:
+            self.delete(entity)
+            return {}
+
+        if types != old: self._move(entity, location, types)
+
+        views = {}
+        for component_instance in component_instances:
+            self._write(location, component_instance)
+            views[type(component_instance)] = self._view(type(component_instance))(location)
+        return views
+
+    def add_many(self, entities, component_columns):
+        table = self._table(frozenset(component_type for component_type, values in component_columns))
+        start = table.add_rows(entities)
+        end   = table.size
+
+        locations = table.locations[start:end]
+        self.locations.update(zip(entities, locations))
+
+        views = {}
+        for component_type, values in component_columns:
+            for name, width, dtype in column_schema(component_type):
+                array = table.arrays[(component_type, name)]
+                if isinstance(values, list): array[start:end] = [_column_value(getattr(value, name), width) for value in values]
+                else:                        array[start:end] = _column_value(getattr(values, name), width)
+
+            view                  = self._view(component_type)
+            views[component_type] = [view(location) for location in locations]
+
+        return views
+
+    def remove(self, entity, component_type):
+        self.assign(entity, [], (component_type, ))
+
+    def delete(self, entity):
+        location = self.locations.pop(entity, None)
+        if location is None or location.table is None: return
+
+        location.table.remove_row(location.row)
+        location.table = None
+        location.row   = -1
+
+    def clear(self):
+        self.tables.clear()
+        self.locations.clear()
+
+    def columns(self, *component_types):
+        required = set(component_types)
+
+        for types, table in self.tables.items():
+            if table.size == 0 or not required.issubset(types): continue
+            yield table.entities[:table.size], [table.columns(ct) for ct in component_types]
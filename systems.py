@@ -7,26 +7,58 @@ from components import RenderableComponent
 from components import TransformComponent
 from components import RigidBodyComponent
 from components import PlayerTagComponent
+from components import PipeStreamComponent
 from components import PipeStateComponent
-from components import PipeTagComponent
 from components import ScoreComponent
+from components import PipeComponent
 from components import FlapComponent
 
+from maths import match_positions
+from maths import Vector2DArray
 from maths import Vector2D
 from ecs import System
 
-import pygame as pg
 import numpy as np
 import physics
 
 class SpriteSheetSequenceSystem(System):
+    reads  = (SpriteSheetSequenceComponent, )
+    writes = (SpriteSheetSequenceComponent, RenderableComponent)
+    phase  = 'render'
+
     def __init__(self):
         super().__init__()
+        self._components = None
+
+    def _update_columns(self, dt, components):
+        from assets import frame_counts
+        from assets import frame_set
+
+        synced           = components is self._components
+        self._components = components
+
+        for ents, (sss, ) in self.world.get_columns(SpriteSheetSequenceComponent):
+            clock, index, frames = sss['clock'], sss['index'], sss['frames']
+
+            clock += dt
+            steps  = (clock / sss['duration']).astype(np.int64)
+            index += steps
+            index %= frame_counts()[frames]
+            clock[clock > sss['duration']] = 0
+
+            rows = np.flatnonzero(steps) if synced else range(len(ents))
+            for row in rows:
+                rend = self.world.try_component(int(ents[row]), RenderableComponent)
+                if rend is not None: rend.sprite = frame_set(frames[row])[index[row]]
 
     def update(self, dt, *args, **kwargs):
         components = self.world.get_components(SpriteSheetSequenceComponent, RenderableComponent)
         if components is None: return
 
+        if self.world.is_columnar(SpriteSheetSequenceComponent):
+            self._update_columns(dt, components)
+            return
+
         for ent, (sss, rend) in components:
             sss.clock += dt
 
@@ -37,72 +69,260 @@ class SpriteSheetSequenceSystem(System):
             if sss.clock > sss.duration: sss.clock = 0
 
 class RenderableSystem(System):
-    def __init__(self, window):
+    reads  = (TransformComponent, RectangleColliderComponent)
+    writes = (RenderableComponent, 'window')
+    phase  = 'render'
+
+    def __init__(self, window, rotation_cache=None):
+        from render import RotationCache
+        from render import RenderQueue
+
         super().__init__()
-        self.window = window
-        self.w      = window.get_width()
-        self.h      = window.get_height()
+        self.window         = window
+        self.w              = window.get_width()
+        self.h              = window.get_height()
+        self.rotation_cache = rotation_cache if rotation_cache is not None else RotationCache()
+        self.queue          = RenderQueue()
 
-    def update(self, *args, **kwargs):
-        components = self.world.get_components(TransformComponent, RenderableComponent)
-        if components is None: return
+    def _refresh_queue(self):
+        if not self.world.observes(self.queue):
+            self.queue.clear()
+            self.world.observe(self.queue, owner=self)
 
-        components.sort(key=lambda x: x[1][1].depth)
-        for ent, (trans, rend) in components:
-            sprite   = rend.sprite
-            if trans.rot != None:
-                sprite   = pg.transform.rotate(sprite.copy(), trans.rot)
-                rend.pos = Vector2D(-0.5 * sprite.get_width(), 0.5 * sprite.get_height())
+        self.queue.refresh()
 
-            pos   = trans.pos + rend.pos
-            pos.y = self.h - pos.y
+    def _sprite(self, trans, rend):
+        sprite   = rend.sprite
+        if trans.rot != None:
+            sprite, rend.pos = self.rotation_cache.get(sprite, trans.rot)
+
+        pos   = trans.pos + rend.pos
+        pos.y = self.h - pos.y
 
-            self.window.blit(sprite, pos.to_tuple())
+        return sprite, pos.to_tuple()
+
+    def _draw_colliders(self):
+        import pygame as pg
+
+        rects = []
 
         for ent, (trans, col) in self.world.get_components(TransformComponent, RectangleColliderComponent):
             pos   = trans.pos + col.pos
             pos.y = self.h - pos.y
 
             color = (0, 255, 0) if len(col.manifolds) <= 0 else (255, 0, 0)
-            pg.draw.rect(self.window, color, (*pos.to_tuple(), col.w, col.h), 2)
+            rects.append(pg.draw.rect(self.window, color, (*pos.to_tuple(), col.w, col.h), 2))
 
             pos   = Vector2D(trans.pos.x, trans.pos.y)
             pos.y = self.h - pos.y
 
             color = (0, 0, 255)
-            pg.draw.lines(self.window, color, False, [(int(pos.x - 8), int(pos.y)), (int(pos.x + 8), int(pos.y))], 2)
-            pg.draw.lines(self.window, color, False, [(int(pos.x), int(pos.y - 8)), (int(pos.x), int(pos.y + 8))], 2)
+            rects.append(pg.draw.lines(self.window, color, False, [(int(pos.x - 8), int(pos.y)), (int(pos.x + 8), int(pos.y))], 2))
+            rects.append(pg.draw.lines(self.window, color, False, [(int(pos.x), int(pos.y - 8)), (int(pos.x), int(pos.y + 8))], 2))
+
+        return rects
+
+    def update(self, *args, **kwargs):
+        self._refresh_queue()
+
+        for depth, entries in self.queue.layers():
+            self.window.blits([self._sprite(trans, rend) for ent, trans, rend in entries], doreturn=False)
+
+        self._draw_colliders()
+
+class BakedRenderableSystem(RenderableSystem):
+    def __init__(self, window, rotation_cache=None):
+        from render import DirtyRects
+
+        super().__init__(window, rotation_cache)
+        self.dirty       = DirtyRects()
+        self.dirty_rects = []
+        self._version    = None
+        self._baked      = []
+        self._layers     = []
+
+    def _is_dynamic(self, ent, trans):
+        if trans.rot != None: return True
+        if self.world.has_component(ent, RigidBodyComponent): return True
+        if self.world.has_component(ent, SpriteSheetSequenceComponent): return True
+        return False
+
+    def _tile_key(self, ent, trans, rend):
+        scroll = self.world.try_component(ent, ScrollableComponent)
+        reset  = self.world.try_component(ent, ResetPositionComponent)
+        if scroll is None or reset is None: return None
+
+        return rend.depth, scroll.speed.to_tuple(), rend.sprite.get_size(), trans.pos.y, reset.pos.x - reset.thresh
+
+    def _bake(self):
+        from render import composite
+
+        static, groups, layers = [], {}, []
+
+        for ent, trans, rend in self.queue:
+            if self._is_dynamic(ent, trans):
+                layers.append(('sprite', ent, trans, rend))
+                continue
+
+            if not self.world.has_component(ent, ScrollableComponent):
+                if not layers: static.append(self._sprite(trans, rend))
+                else:          layers.append(('sprite', ent, trans, rend))
+                continue
+
+            key = self._tile_key(ent, trans, rend)
+            if key is None:
+                layers.append(('sprite', ent, trans, rend))
+            elif key in groups:
+                groups[key].append((trans, rend))
+            else:
+                groups[key] = [(trans, rend)]
+                layers.append(('tiles', key))
+
+        self._layers = []
+        if static:
+            self._layers.append(('background', 'background', composite((self.w, self.h), static, background=(0, 0, 0)), [(0, 0)]))
+
+        for layer in layers:
+            if layer[0] == 'sprite':
+                self._layers.append(layer)
+                continue
+
+            key   = layer[1]
+            tiles = sorted(groups[key], key=lambda tile: tile[0].pos.x)
+            width = tiles[0][1].sprite.get_width()
+
+            if len(tiles) * width != key[-1]:
+                self._layers.extend(('sprite', None, trans, rend) for trans, rend in tiles)
+                continue
+
+            last = self._layers[-1] if self._layers else None
+            if last is not None and last[0] == 'strip' and last[1][1:] == key[1:] and all(a[0].pos.x == b[0].pos.x for a, b in zip(last[2], tiles)):
+                segments         = [(trans, rend, composite(tile.get_size(), [(tile, (0, 0)), (top.sprite, (0, 0))])) for (trans, rend, tile), (top_trans, top) in zip(last[2], tiles)]
+                self._layers[-1] = ('strip', last[1], segments)
+            else:
+                self._layers.append(('strip', key, [(trans, rend, rend.sprite) for trans, rend in tiles]))
+
+        self._version = self.queue.version
+        self._baked   = [(rend, rend.sprite) for ent, trans, rend in self.queue if not self._is_dynamic(ent, trans)]
+        self.dirty.invalidate()
+
+    def _flush(self, pending):
+        if not pending: return
+
+        rects = self.window.blits([(sprite, pos) for key, sprite, pos in pending])
+        for (key, sprite, pos), rect in zip(pending, rects):
+            self.dirty.mark(key, rect, sprite)
+        pending.clear()
+
+    def update(self, *args, **kwargs):
+        self._refresh_queue()
+
+        if self.queue.version != self._version or any(rend.sprite is not sprite for rend, sprite in self._baked):
+            self._bake()
+
+        self.dirty.begin()
+        pending = []
+        for layer in self._layers:
+            if layer[0] == 'background':
+                self._flush(pending)
+                self.dirty.mark(layer[1], self.window.blit(layer[2], layer[3][0]), layer[2])
+
+            elif layer[0] == 'strip':
+                self._flush(pending)
+                for i, (trans, rend, tile) in enumerate(layer[2]):
+                    sprite, pos = self._sprite(trans, rend)
+                    self.dirty.mark((layer[1], i), self.window.blit(tile, pos), tile)
+
+            else:
+                sprite, pos = self._sprite(layer[2], layer[3])
+                pending.append((id(layer[3]), sprite, pos))
+
+        self._flush(pending)
+
+        for rect in self._draw_colliders():
+            self.dirty.add(rect)
+
+        self.dirty_rects = self.dirty.end()
 
 class ScoreRenderSystem(System):
+    reads  = (ScoreComponent, )
+    writes = ('window', )
+    tracks = (ScoreComponent, )
+    phase  = 'render'
+
     def __init__(self, window, font):
+        from render import GlyphAtlas
+
         super().__init__()
         self.window = window
         self.w      = window.get_width()
         self.h      = window.get_height()
         self.font   = font
+        self.atlas  = GlyphAtlas(font, (255, 255, 255))
+        self.rects  = []
+        self.texts  = {}
 
     def update(self, *args, **kwargs):
-        components = self.world.get_component(ScoreComponent)
-        if components is None: return
+        for ent in self.world.removed(ScoreComponent):
+            self.texts.pop(ent, None)
+
+        for ent, score in self.world.changed(ScoreComponent):
+            self.texts[ent] = self.atlas.layout(f'{score.value}', center=(0.5 * self.w, 50))
+
+        self.rects = []
+        for blits, rect in self.texts.values():
+            self.window.blits(blits, doreturn=False)
+            self.rects.append(rect)
+
+class ProfilerOverlaySystem(System):
+    reads  = ()
+    writes = ('window', )
+    phase  = 'render'
+
+    def __init__(self, window, font, top=5, pos=(10, 40)):
+        super().__init__()
+        self.window = window
+        self.font   = font
+        self.top    = top
+        self.pos    = pos
+        self.line_h = font.get_linesize()
+        self.rects  = []
+
+    def update(self, *args, **kwargs):
+        profiler = self.world.profiler
+        if profiler is None: return
 
-        for ent, score in components:
-            text      = self.font.render(f'{score.value}', True, (255, 255, 255))
-            text_rect = text.get_rect(center=(0.5 * self.w, 50))
-            self.window.blit(text, text_rect)
+        x, y       = self.pos
+        self.rects = [self.window.fill((0, 0, 0), (x, y, 360, self.line_h * self.top))]
+        for i, stat in enumerate(profiler.top(self.top)):
+            p50, p95, p99 = stat['percentiles'].values()
+            line          = f'{stat["name"].removesuffix("System"):<18} {p50:5.2f} {p95:5.2f} {p99:5.2f} ms'
+            self.window.blit(self.font.render(line, True, (255, 255, 255)), (x, y + i * self.line_h))
 
 class GravitySystem(System):
+    reads  = ()
+    writes = (RigidBodyComponent, )
+
     def __init__(self, force=-9.8):
         super().__init__()
         self.force = force
 
     def update(self, *args, **kwargs):
+        if self.world.is_columnar(RigidBodyComponent):
+            for ents, (rigid, ) in self.world.get_columns(RigidBodyComponent):
+                rigid['acc'][:, 1] += self.force
+            return
+
         components = self.world.get_component(RigidBodyComponent)
         if components is None: return
 
         for ent, rigid in components:
-            rigid.acc += Vector2D(0, self.force)
+            rigid.acc.y += self.force
 
 class FlapSystem(System):
+    reads  = (FlapComponent, )
+    writes = (RigidBodyComponent, )
+
     def __init__(self):
         super().__init__()
 
@@ -112,14 +332,28 @@ class FlapSystem(System):
 
         if not inputs['SPACE_BAR']: return
 
+        if self.world.is_columnar(FlapComponent, RigidBodyComponent):
+            for ents, (flap, rigid) in self.world.get_columns(FlapComponent, RigidBodyComponent):
+                rigid['vel'][:, 0] = 0
+                rigid['vel'][:, 1] = flap['force']
+            return
+
         for ent, (flap, rigid) in components:
-            rigid.vel = Vector2D(0, flap.force)
+            rigid.vel.set(0, flap.force)
 
 class TiltSystem(System):
+    reads  = (RigidBodyComponent, )
+    writes = (TransformComponent, )
+
     def __init__(self):
         super().__init__()
 
     def update(self, *args, **kwargs):
+        if self.world.is_columnar(TransformComponent, RigidBodyComponent):
+            for ents, (trans, rigid) in self.world.get_columns(TransformComponent, RigidBodyComponent):
+                trans['rot'][:] = np.clip(rigid['vel'][:, 1], -400, 400) / 400 * 45
+            return
+
         components = self.world.get_components(TransformComponent, RigidBodyComponent)
         if components is None: return
 
@@ -128,73 +362,206 @@ class TiltSystem(System):
             trans.rot = vel * 45
 
 class MovementSystem(System):
+    reads  = ()
+    writes = (TransformComponent, RigidBodyComponent)
+
     def __init__(self):
         super().__init__()
 
     def update(self, dt, *args, **kwargs):
+        if self.world.is_columnar(TransformComponent, RigidBodyComponent):
+            for ents, (trans, rigid) in self.world.get_columns(TransformComponent, RigidBodyComponent):
+                pos, vel, acc = Vector2DArray(trans['pos']), Vector2DArray(rigid['vel']), Vector2DArray(rigid['acc'])
+
+                last_vel = vel.copy()
+                vel.add_scaled(acc, dt)
+                pos.add_scaled(last_vel.add_scaled(vel, 1), 0.5 * dt)
+                acc.set(0, 0)
+            return
+
         components = self.world.get_components(TransformComponent, RigidBodyComponent)
         if components is None: return
 
         for ent, (trans, rigid) in components:
-            last_vel   = Vector2D(rigid.vel.x, rigid.vel.y)
-            rigid.vel += rigid.acc * dt
-            trans.pos += 0.5 * (last_vel + rigid.vel) * dt
+            pos, vel, acc  = trans.pos, rigid.vel, rigid.acc
+            last_x, last_y = vel.x, vel.y
 
-            rigid.acc = Vector2D()
+            vel.add_scaled(acc, dt)
+            pos.x += 0.5 * (last_x + vel.x) * dt
+            pos.y += 0.5 * (last_y + vel.y) * dt
+
+            acc.set(0, 0)
 
 class ScrollableSystem(System):
+    reads  = (ScrollableComponent, )
+    writes = (TransformComponent, )
+
     def __init__(self):
         super().__init__()
 
     def update(self, dt, *args, **kwargs):
+        if self.world.is_columnar(TransformComponent, ScrollableComponent):
+            for ents, (trans, scroll) in self.world.get_columns(TransformComponent, ScrollableComponent):
+                Vector2DArray(trans['pos']).add_scaled(Vector2DArray(scroll['speed']), dt)
+            return
+
         components = self.world.get_components(TransformComponent, ScrollableComponent)
         if components is None: return
 
         for ent, (trans, scroll) in components:
-            trans.pos += scroll.speed * dt
+            trans.pos.add_scaled(scroll.speed, dt)
 
 class ResetPositionSystem(System):
+    reads  = (ResetPositionComponent, )
+    writes = (TransformComponent, )
+
     def __init__(self, window):
         super().__init__()
 
     def update(self, *args, **kwargs):
+        if self.world.is_columnar(TransformComponent, ResetPositionComponent):
+            for ents, (trans, reset) in self.world.get_columns(TransformComponent, ResetPositionComponent):
+                mask               = trans['pos'][:, 0] < reset['thresh']
+                trans['pos'][mask] = reset['pos'][mask]
+            return
+
         components = self.world.get_components(TransformComponent, ResetPositionComponent)
         if components is None: return
 
         for ent, (trans, reset) in components:
             if trans.pos.x < reset.thresh:
-                trans.pos = Vector2D(reset.pos.x, reset.pos.y)
+                trans.pos.copy_from(reset.pos)
 
-class ResetPipeOffsetSystem(System):
-    def __init__(self, offset_range):
+class PipeStreamSystem(System):
+    reads  = (PipeComponent, )
+    writes = (TransformComponent, PipeStateComponent, PipeStreamComponent)
+
+    def __init__(self, offset_range, thresh=-69, block=256, rng=None):
         super().__init__()
         self.offset_range = offset_range
+        self.thresh       = thresh
+        self.block        = block
+        self.rng          = rng
+        self._offsets     = {}
+
+    def next_offset(self, stream):
+        if stream.cursor == len(stream.offsets):
+            rng            = self.rng if self.rng is not None else np.random
+            stream.offsets = rng.randint(*self.offset_range, size=self.block).tolist()
+            stream.cursor  = 0
+
+        stream.cursor += 1
+        return stream.offsets[stream.cursor - 1]
+
+    def _pair_offset(self, stream, offsets, pair):
+        if pair not in offsets: offsets[pair] = self.next_offset(stream)
+        return offsets[pair]
 
     def update(self, *args, **kwargs):
-        components = self.world.get_components(TransformComponent, PipeTagComponent, ResetPositionComponent)
+        streams = self.world.get_component(PipeStreamComponent)
+        if not streams: return
+
+        stream  = streams[0][1]
+        wrap    = stream.pairs * stream.spacing
+        offsets = self._offsets
+        if offsets: offsets.clear()
+
+        if self.world.is_columnar(TransformComponent, PipeComponent):
+            for ents, (trans, pipe, state) in self.world.get_columns(TransformComponent, PipeComponent, PipeStateComponent):
+                mask                 = trans['pos'][:, 0] < self.thresh
+                state['value'][mask] = False
+                self.world.mark_changed_many(ents[mask].tolist(), PipeStateComponent)
+
+            for ents, (trans, pipe) in self.world.get_columns(TransformComponent, PipeComponent):
+                mask = trans['pos'][:, 0] < self.thresh
+                if not mask.any(): continue
+
+                pairs                 = pipe['pair'][mask].tolist()
+                trans['pos'][mask, 0] += wrap
+                trans['pos'][mask, 1] = pipe['base'][mask] + [self._pair_offset(stream, offsets, pair) for pair in pairs]
+            return
+
+        components = self.world.get_components(TransformComponent, PipeComponent)
         if components is None: return
 
-        offset = np.random.randint(*self.offset_range)
-        for ent, (trans, tag, reset) in components:
-            if trans.pos.y <= reset.pos.y:
-                trans.pos.y += offset
+        for ent, (trans, pipe) in components:
+            if trans.pos.x >= self.thresh: continue
+
+            state = self.world.try_component(ent, PipeStateComponent)
+            if state is not None:
+                state.value = False
+                self.world.mark_changed(ent, PipeStateComponent)
+
+            trans.pos.x += wrap
+            trans.pos.y  = pipe.base + self._pair_offset(stream, offsets, pipe.pair)
 
 class ResetPipeStateSystem(System):
+    reads  = (TransformComponent, ResetPositionComponent)
+    writes = (PipeStateComponent, )
+
     def __init__(self):
         super().__init__()
 
     def update(self, *args, **kwargs):
+        if self.world.is_columnar(TransformComponent, ResetPositionComponent, PipeStateComponent):
+            for ents, (trans, reset, state) in self.world.get_columns(TransformComponent, ResetPositionComponent, PipeStateComponent):
+                mask                 = trans['pos'][:, 0] >= reset['pos'][:, 0]
+                state['value'][mask] = False
+                self.world.mark_changed_many(ents[mask].tolist(), PipeStateComponent)
+            return
+
         components = self.world.get_components(TransformComponent, ResetPositionComponent, PipeStateComponent)
         if components is None: return
 
         for ent, (trans, reset, state) in components:
             if trans.pos.x >= reset.pos.x:
                 state.value = False
+                self.world.mark_changed(ent, PipeStateComponent)
 
 class CollisionSystem(System):
-    def __init__(self, window):
+    reads  = (TransformComponent, RigidBodyComponent, PlayerTagComponent, ObstacleTagComponent)
+    writes = (RectangleColliderComponent, )
+
+    def __init__(self, window, swept=False, snap=256):
         super().__init__()
-        self.h = window.get_height()
+        self.h          = window.get_height()
+        self.broadphase = physics.SweepAndPrune()
+        self.swept      = swept
+        self.snap       = snap
+        self.previous   = None
+
+    def _boxes(self, colliders):
+        pos  = np.empty((len(colliders), 2))
+        size = np.empty((len(colliders), 2))
+
+        for i, (trans, col) in enumerate(colliders):
+            trans_pos, col_pos = trans.pos, col.pos
+            pos[i]             = trans_pos.x + col_pos.x, self.h - (trans_pos.y + col_pos.y)
+            size[i]            = col.w, col.h
+
+        return pos, size
+
+    def _displacement(self, ents, pos):
+        disp = np.zeros_like(pos)
+        if self.previous is None: return disp
+
+        prev_ents, prev_pos = self.previous
+        known, found        = match_positions(ents, pos, prev_ents, prev_pos, self.snap)
+
+        disp[known] = pos[known] - prev_pos[found]
+        return disp
+
+    def _hits(self, components, col_components, pos_a, size_a, pos_b, size_b):
+        if not self.swept:
+            return self.broadphase.query(pos_a, size_a, pos_b, size_b)
+
+        ents = np.array([ent for ent, row in components] + [ent for ent, row in col_components], dtype=np.int64)
+        pos  = np.concatenate((pos_a, pos_b))
+        disp = self._displacement(ents, pos)
+
+        self.previous = ents, pos
+        a, b, toi     = self.broadphase.sweep(pos_a, size_a, disp[:len(pos_a)], pos_b, size_b, disp[len(pos_a):])
+        return a, b
 
     def update(self, *args, **kwargs):
         components = self.world.get_components(TransformComponent, RigidBodyComponent, RectangleColliderComponent, PlayerTagComponent)
@@ -205,53 +572,67 @@ class CollisionSystem(System):
 
         for ent, (trans, rigid, col, tag) in components:
             col.manifolds = []
-            for ent_b, (trans_b, col_b, tag_b) in col_components:
-                collision = physics.aabb_aabb_collision(trans, col, trans_b, col_b, self.h)
-                if collision:
-                    col.manifolds.append(ent_b)
+
+        if not components or not col_components:
+            self.previous = None
+            return
+
+        pos_a, size_a = self._boxes([(trans, col) for ent, (trans, rigid, col, tag) in components])
+        pos_b, size_b = self._boxes([(trans, col) for ent, (trans, col, tag) in col_components])
+
+        for a, b in zip(*self._hits(components, col_components, pos_a, size_a, pos_b, size_b)):
+            ent, (trans, rigid, col, tag) = components[a]
+            col.manifolds.append(col_components[b][0])
+            self.world.mark_changed(ent, RectangleColliderComponent)
 
 class PlayerStateSystem(System):
+    tracks = (RectangleColliderComponent, )
+
     def __init__(self, scrollable_component, dead_sprite):
         super().__init__()
         self.scrollable_component = scrollable_component
         self.dead_sprite          = dead_sprite
 
     def update(self, *args, **kwargs):
-        components = self.world.get_components(TransformComponent, RectangleColliderComponent, RenderableComponent, PlayerTagComponent)
-        if components is None: return
+        for ent, col in self.world.changed(RectangleColliderComponent):
+            if len(col.manifolds) <= 0: continue
+            if not self.world.has_component(ent, PlayerTagComponent): continue
+
+            trans = self.world.try_component(ent, TransformComponent)
+            rend  = self.world.try_component(ent, RenderableComponent)
+            if trans is None or rend is None: continue
 
-        for ent, (trans, col, rend, tag) in components:
-            if len(col.manifolds) > 0:
-                trans.rot   = 0
-                rend.sprite = self.dead_sprite
+            trans.rot   = 0
+            rend.sprite = self.dead_sprite
 
-                self.world.remove_component(ent, SpriteSheetSequenceComponent)
-                self.world.remove_component(ent, RigidBodyComponent)
-                self.world.remove_component(ent, FlapComponent)
-                self.world.remove_component(ent, PlayerTagComponent)
+            commands = self.world.commands
+            commands.remove(ent, SpriteSheetSequenceComponent)
+            commands.remove(ent, RigidBodyComponent)
+            commands.remove(ent, FlapComponent)
+            commands.remove(ent, PlayerTagComponent)
 
-                scrollable_component = ScrollableComponent(
-                    self.scrollable_component.speed.x,
-                    self.scrollable_component.speed.y
-                )
-                self.world.add_component(ent, scrollable_component)
+            scrollable_component = ScrollableComponent(
+                self.scrollable_component.speed.x,
+                self.scrollable_component.speed.y
+            )
+            commands.add(ent, scrollable_component)
 
 class ScoreSystem(System):
+    reads  = (TransformComponent, RectangleColliderComponent, PlayerTagComponent)
+    writes = (PipeStateComponent, ScoreComponent)
+
     def __init__(self):
         super().__init__()
 
     def update(self, *args, **kwargs):
-        components = self.world.get_components(TransformComponent, RectangleColliderComponent, PipeStateComponent, PipeStateComponent)
-        if components is None: return
-
-        player_components = self.world.get_components(TransformComponent, RectangleColliderComponent, ScoreComponent, PlayerTagComponent)
-        if player_components is None: return
+        components        = self.world.query(with_=(TransformComponent, RectangleColliderComponent, PipeStateComponent))
+        player_components = self.world.query(with_=(TransformComponent, RectangleColliderComponent, ScoreComponent, PlayerTagComponent))
 
         for p_ent, (p_trans, p_col, p_score, p_tag) in player_components:
             p_pos = p_trans.pos + p_col.pos
 
-            for ent, (trans, col, state, tag) in components:
-                if state.value == True: return
+            for ent, (trans, col, state) in components:
+                if state.value == True: continue
 
                 pos    = trans.pos + col.pos
                 pos.x += col.w
@@ -259,4 +640,6 @@ class ScoreSystem(System):
                 if p_pos.x > pos.x:
                     p_score.value += 1
                     state.value    = True
+                    self.world.mark_changed(p_ent, ScoreComponent)
+                    self.world.mark_changed(ent, PipeStateComponent)
                     return
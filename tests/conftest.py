@@ -0,0 +1,19 @@
+import pytest
+import sys
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+@pytest.fixture(params=[False, True], ids=['object', 'columnar'])
+def columnar(request):
+    return request.param
+
+@pytest.fixture
+def world(columnar):
+    from ecs import World
+    return World(columnar=columnar)
@@ -0,0 +1,119 @@
+from components import PipeStreamComponent
+from components import TransformComponent
+from components import PipeStateComponent
+from components import PipeComponent
+
+from systems import PipeStreamSystem
+from ecs import System
+from ecs import World
+
+import numpy as np
+import pytest
+
+class WatchSystem(System):
+    tracks = (TransformComponent, )
+
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+
+    def update(self, *args, **kwargs):
+        self.seen.append((
+            [entity for entity, trans in self.world.added(TransformComponent)],
+            [entity for entity, trans in self.world.changed(TransformComponent)],
+            self.world.removed(TransformComponent)
+        ))
+
+class TouchSystem(System):
+    def __init__(self):
+        super().__init__()
+        self.pending = []
+
+    def update(self, *args, **kwargs):
+        for entity in self.pending:
+            self.world.mark_changed(entity, TransformComponent)
+        self.pending = []
+
+def build(touch_priority):
+    world, watch, touch = World(), WatchSystem(), TouchSystem()
+    world.add_system(watch, priority=0)
+    world.add_system(touch, priority=touch_priority)
+    return world, watch, touch
+
+def test_each_change_is_reported_once():
+    world, watch, touch = build(touch_priority=1)
+    a = world.create_entity(TransformComponent(0, 0))
+    b = world.create_entity(TransformComponent(0, 0))
+
+    world.update()
+    world.update()
+    world.mark_changed(a, TransformComponent)
+    world.update()
+    world.remove_component(b, TransformComponent)
+    world.update()
+    world.update()
+
+    assert watch.seen == [
+        ([a, b], [a, b], []),
+        ([], [], []),
+        ([], [a], []),
+        ([], [], [b]),
+        ([], [], []),
+    ]
+
+def test_writer_before_reader_is_seen_the_same_frame():
+    world, watch, touch = build(touch_priority=1)
+    entity = world.create_entity(TransformComponent(0, 0))
+    world.update()
+
+    touch.pending = [entity]
+    world.update()
+    assert watch.seen[-1][1] == [entity]
+
+    world.update()
+    assert watch.seen[-1][1] == []
+
+def test_writer_after_reader_is_seen_the_next_frame():
+    world, watch, touch = build(touch_priority=-1)
+    entity = world.create_entity(TransformComponent(0, 0))
+    world.update()
+
+    touch.pending = [entity]
+    world.update()
+    assert watch.seen[-1][1] == []
+
+    world.update()
+    assert watch.seen[-1][1] == [entity]
+
+def test_changes_since_an_explicit_tick():
+    world  = World()
+    world.track(TransformComponent)
+    world.add_system(TouchSystem())
+    a      = world.create_entity(TransformComponent(0, 0))
+    b      = world.create_entity(TransformComponent(0, 0))
+    tick   = world.change_tick()
+
+    world.update()
+    world.mark_changed(b, TransformComponent)
+
+    assert [entity for entity, trans in world.changed(TransformComponent, since=-1)] == [a, b]
+    assert [entity for entity, trans in world.changed(TransformComponent, since=tick)] == [b]
+
+def test_untracked_component_raises():
+    with pytest.raises(KeyError): World().changed(TransformComponent)
+
+def test_pipe_stream_only_resets_pipes(world):
+    world.track(PipeStateComponent)
+    world.add_system(PipeStreamSystem((0, 10), thresh=0, rng=np.random.RandomState(0)))
+
+    world.create_entity(PipeStreamComponent())
+    pipe  = world.create_entity(TransformComponent(-5, 0), PipeComponent(), PipeStateComponent())
+    other = world.create_entity(TransformComponent(-5, 0), PipeStateComponent())
+    for ent in (pipe, other): world.try_component(ent, PipeStateComponent).value = True
+
+    tick = world.change_tick()
+    world.update()
+
+    assert world.try_component(pipe, PipeStateComponent).value is False
+    assert world.try_component(other, PipeStateComponent).value is True
+    assert [entity for entity, state in world.changed(PipeStateComponent, since=tick)] == [pipe]
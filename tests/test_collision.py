@@ -0,0 +1,71 @@
+from components import RectangleColliderComponent
+from components import ObstacleTagComponent
+from components import TransformComponent
+from components import RigidBodyComponent
+from components import PlayerTagComponent
+
+from systems import CollisionSystem
+from physics import SweepAndPrune
+from physics import swept_aabb
+from ecs import World
+
+import pygame as pg
+import numpy as np
+import pytest
+
+def boxes(*rows):
+    return tuple(np.array(column, dtype=np.float64) for column in zip(*rows))
+
+def test_swept_aabb_catches_a_pass_through():
+    hit, toi = swept_aabb(np.array([100., 0.]), np.array([10., 10.]), np.array([100., 0.]), np.array([50., 0.]), np.array([5., 10.]), np.array([0., 0.]))
+    assert hit and toi == pytest.approx(0.4)
+
+def test_swept_aabb_uses_relative_motion():
+    hit, toi = swept_aabb(np.array([100., 0.]), np.array([10., 10.]), np.array([100., 0.]), np.array([150., 0.]), np.array([5., 10.]), np.array([100., 0.]))
+    assert not hit
+
+def test_swept_aabb_misses_off_the_path():
+    hit, toi = swept_aabb(np.array([100., 20.]), np.array([10., 10.]), np.array([100., 0.]), np.array([50., 0.]), np.array([5., 10.]), np.array([0., 0.]))
+    assert not hit
+
+def test_sweep_finds_pairs_the_discrete_query_tunnels_through():
+    pos_a, size_a, disp_a = boxes(((100, 0), (10, 10), (100, 0)), ((300, 0), (10, 10), (4, 0)))
+    pos_b, size_b, disp_b = boxes(((50, 0), (5, 10), (0, 0)), ((400, 0), (5, 10), (0, 0)))
+
+    a, b = SweepAndPrune().query(pos_a, size_a, pos_b, size_b)
+    assert len(a) == 0
+
+    a, b, toi = SweepAndPrune().sweep(pos_a, size_a, disp_a, pos_b, size_b, disp_b)
+    assert a.tolist() == [0] and b.tolist() == [0]
+    assert toi.tolist() == pytest.approx([0.4])
+
+@pytest.mark.parametrize('swept, expected', [(False, False), (True, True)], ids=['discrete', 'swept'])
+def test_coarse_step_tunnels_only_without_sweeping(swept, expected):
+    world    = World()
+    world.add_system(CollisionSystem(pg.Surface((800, 600)), swept=swept))
+
+    trans    = TransformComponent(0, 300)
+    col      = RectangleColliderComponent(0, 0, 20, 20)
+    obstacle = world.create_entity(TransformComponent(100, 300), RectangleColliderComponent(0, 0, 20, 20), ObstacleTagComponent())
+    world.create_entity(trans, RigidBodyComponent(), col, PlayerTagComponent())
+
+    world.update()
+    assert col.manifolds == []
+
+    trans.pos.x = 160
+    world.update()
+    assert (col.manifolds == [obstacle]) == expected
+
+def test_teleport_beyond_snap_is_not_swept():
+    world    = World()
+    world.add_system(CollisionSystem(pg.Surface((800, 600)), swept=True, snap=50))
+
+    trans    = TransformComponent(0, 300)
+    col      = RectangleColliderComponent(0, 0, 20, 20)
+    world.create_entity(TransformComponent(100, 300), RectangleColliderComponent(0, 0, 20, 20), ObstacleTagComponent())
+    world.create_entity(trans, RigidBodyComponent(), col, PlayerTagComponent())
+
+    world.update()
+    trans.pos.x = 160
+    world.update()
+    assert col.manifolds == []
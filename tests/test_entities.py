@@ -0,0 +1,56 @@
+from components import TransformComponent
+from components import RigidBodyComponent
+
+from ecs import entity_generation
+from ecs import StaleEntityError
+from ecs import entity_index
+from ecs import World
+
+import pytest
+
+def test_stale_handle_is_rejected():
+    world  = World()
+    entity = world.create_entity(TransformComponent(1, 2))
+    world.delete_entity(entity, immediate=True)
+
+    assert not world.is_alive(entity)
+    with pytest.raises(StaleEntityError): world.add_component(entity, RigidBodyComponent())
+    with pytest.raises(StaleEntityError): world.has_component(entity, TransformComponent)
+    with pytest.raises(StaleEntityError): world.delete_entity(entity)
+
+def test_reused_slot_gets_new_generation():
+    world  = World()
+    old    = world.create_entity(TransformComponent(1, 2))
+    world.delete_entity(old, immediate=True)
+    new    = world.create_entity(TransformComponent(3, 4))
+
+    assert entity_index(new) == entity_index(old)
+    assert entity_generation(new) == entity_generation(old) + 1
+    assert world.is_alive(new) and not world.is_alive(old)
+    assert world.try_component(new, TransformComponent).pos.x == 3
+    with pytest.raises(StaleEntityError): world.try_component(old, TransformComponent)
+
+def test_stale_handle_in_deferred_commands_is_ignored():
+    world  = World()
+    old    = world.create_entity(TransformComponent(1, 2))
+    world.delete_entity(old, immediate=True)
+    new    = world.create_entity(TransformComponent(3, 4))
+
+    world.commands.add(old, RigidBodyComponent())
+    world.commands.destroy(old)
+    world.apply_commands()
+
+    assert world.is_alive(new)
+    assert not world.has_component(new, RigidBodyComponent)
+
+def test_bulk_create_reuses_free_slots_first():
+    world = World()
+    first = world.create_entities(4, TransformComponent(0, 0))
+    for entity in first[:2]: world.delete_entity(entity, immediate=True)
+
+    second = world.create_entities(3, TransformComponent(0, 0))
+
+    assert sorted(map(entity_index, second[:2])) == sorted(map(entity_index, first[:2]))
+    assert all(entity_generation(entity) == 1 for entity in second[:2])
+    assert entity_generation(second[2]) == 0
+    assert len(world.get_component(TransformComponent)) == 5
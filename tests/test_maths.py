@@ -0,0 +1,20 @@
+from maths import Vector2D
+
+import pytest
+
+def test_arithmetic_with_non_vectors_raises_type_error():
+    vector = Vector2D(1, 2)
+
+    with pytest.raises(TypeError): 0 + vector
+    with pytest.raises(TypeError): 0 - vector
+    assert vector != (1, 2)
+
+def test_in_place_arithmetic_keeps_the_instance():
+    vector = Vector2D(1, 2)
+    same   = vector
+
+    vector += Vector2D(3, 4)
+    vector -= Vector2D(1, 1)
+    vector *= 2
+
+    assert vector is same and vector == Vector2D(6, 10)
@@ -0,0 +1,20 @@
+from pool import EnvPool
+
+import numpy as np
+import pytest
+
+def test_send_to_a_busy_worker_leaves_the_pool_untouched():
+    with EnvPool(2, 4, seed=0) as pool:
+        pool.reset()
+        pool.send(np.ones(4, dtype=bool), [1])
+
+        with pytest.raises(RuntimeError): pool.send(np.zeros(8, dtype=bool))
+
+        assert pool.pending == {1}
+        assert pool.views['actions'][1].all()
+
+        workers, obs, rewards, dones = pool.recv()
+        assert workers.tolist() == [1]
+
+        obs, rewards, dones = pool.step(np.zeros(8, dtype=bool))
+        assert obs.shape[0] == 8
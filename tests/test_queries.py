@@ -0,0 +1,75 @@
+from components import ObstacleTagComponent
+from components import TransformComponent
+from components import RigidBodyComponent
+from components import PlayerTagComponent
+
+import pytest
+
+def entities(query):
+    return sorted(entity for entity, row in query)
+
+def test_include_exclude_optional(world):
+    moving   = world.create_entity(TransformComponent(0, 0), RigidBodyComponent(1, 0))
+    world.create_entity(TransformComponent(0, 0), RigidBodyComponent(2, 0), PlayerTagComponent())
+    static   = world.create_entity(TransformComponent(0, 0), ObstacleTagComponent())
+    query    = world.query(with_=(TransformComponent, ), without=(PlayerTagComponent, ), optional=(RigidBodyComponent, ))
+
+    assert entities(query) == sorted([moving, static])
+
+    rows = dict(query)
+    assert rows[moving][1].vel.x == 1
+    assert rows[static][1] is None
+    assert world.query(with_=(TransformComponent, ), without=(PlayerTagComponent, ), optional=(RigidBodyComponent, )) is query
+
+def test_query_follows_structural_changes(world):
+    entity = world.create_entity(TransformComponent(0, 0))
+    query  = world.query(with_=(TransformComponent, RigidBodyComponent), without=(PlayerTagComponent, ))
+    assert entity not in query
+
+    world.add_component(entity, RigidBodyComponent())
+    assert entity in query
+
+    world.add_component(entity, PlayerTagComponent())
+    assert entity not in query
+
+    world.remove_component(entity, PlayerTagComponent)
+    assert entity in query
+
+    world.remove_component(entity, RigidBodyComponent)
+    assert entity not in query
+
+def test_query_follows_deferred_commands_and_bulk_create(world):
+    query   = world.query(with_=(TransformComponent, RigidBodyComponent))
+    created = world.create_entities(3, TransformComponent(0, 0), RigidBodyComponent())
+    assert entities(query) == sorted(created)
+
+    world.commands.remove(created[0], RigidBodyComponent)
+    world.commands.destroy(created[1])
+    spawned = world.commands.spawn(TransformComponent(0, 0), RigidBodyComponent())
+    world.apply_commands()
+
+    assert entities(query) == sorted([created[2], spawned])
+
+def test_reused_slot_starts_with_empty_mask(world):
+    query  = world.query(with_=(TransformComponent, ), without=(PlayerTagComponent, ))
+    old    = world.create_entity(TransformComponent(0, 0), PlayerTagComponent())
+    world.delete_entity(old, immediate=True)
+    new    = world.create_entity(TransformComponent(0, 0))
+
+    assert entities(query) == [new]
+
+def test_query_survives_snapshot_restore(world):
+    query  = world.query(with_=(TransformComponent, ), without=(PlayerTagComponent, ))
+    keep   = world.create_entity(TransformComponent(0, 0))
+    player = world.create_entity(TransformComponent(0, 0), PlayerTagComponent())
+    state  = world.snapshot()
+
+    world.remove_component(player, PlayerTagComponent)
+    world.restore(state)
+    assert entities(query) == [keep]
+
+    world.remove_component(player, PlayerTagComponent)
+    assert entities(query) == sorted([keep, player])
+
+def test_query_needs_an_included_type(world):
+    with pytest.raises(ValueError): world.query(without=(PlayerTagComponent, ))
@@ -0,0 +1,77 @@
+from components import RectangleColliderComponent
+from components import ObstacleTagComponent
+from components import TransformComponent
+from components import PlayerTagComponent
+
+from game import InputManager
+from game import build_world
+from game import DISPLAY
+
+from replay import final_score
+from replay import Recording
+from replay import Recorder
+from replay import replay
+
+from assets import AssetManager
+from ecs import World
+
+import pygame as pg
+import numpy as np
+import pytest
+
+def positions(world):
+    return sorted((entity, trans.pos.x, trans.pos.y, trans.rot) for entity, trans in world.get_component(TransformComponent))
+
+def boxes(world, tag):
+    return [(trans.pos.x + col.pos.x, trans.pos.y + col.pos.y, col.w, col.h) for entity, (trans, col, marker) in world.get_components(TransformComponent, RectangleColliderComponent, tag)]
+
+def flap(world):
+    player = boxes(world, PlayerTagComponent)
+    if not player: return False
+
+    x, y, w, h = player[0]
+    ahead      = sorted(box for box in boxes(world, ObstacleTagComponent) if box[0] + box[2] > x and box[2] < DISPLAY[0])
+    if not ahead: return y - h / 2 < DISPLAY[1] / 2
+
+    pair = [box for box in ahead if abs(box[0] - ahead[0][0]) < 1]
+    gap  = (min(box[1] for box in pair) + max(box[1] - box[3] for box in pair)) / 2
+    return y - h / 2 < gap - 35
+
+def play(assets, seed, steps, swept=False):
+    world  = World()
+    inputs = InputManager()
+    build_world(world, pg.Surface(DISPLAY), assets, render=None, rng=np.random.RandomState(seed), swept=swept)
+
+    recorder = Recorder(inputs, seed, swept=swept)
+    for step in range(steps):
+        dt                       = (1 / 60, 1 / 45, 1 / 90)[step % 3]
+        inputs.KEYS['SPACE_BAR'] = step % 4 == 0 and flap(world)
+        world.step('simulation', dt=dt, inputs=inputs)
+        recorder.record(dt)
+
+    return world, recorder.recording(final_score(world))
+
+@pytest.mark.parametrize('swept', [False, True], ids=['discrete', 'swept'])
+def test_replay_reproduces_the_recorded_run(swept, tmp_path):
+    assets           = AssetManager()
+    world, recording = play(assets, seed=11, steps=1500, swept=swept)
+    assert recording.score > 0
+
+    recording.save(tmp_path / 'run.rec')
+    loaded = Recording.load(tmp_path / 'run.rec')
+    assert loaded.seed == recording.seed and loaded.swept == swept
+    assert np.array_equal(loaded.dts, recording.dts) and np.array_equal(loaded.inputs, recording.inputs)
+
+    replayed, elapsed = replay(loaded, assets=assets)
+    assert final_score(replayed) == recording.score
+    assert positions(replayed) == positions(world)
+
+def test_replay_matches_across_storage():
+    assets           = AssetManager()
+    world, recording = play(assets, seed=5, steps=1200)
+
+    objects, elapsed  = replay(recording, columnar=False, assets=assets)
+    columns, elapsed  = replay(recording, columnar=True, assets=assets)
+
+    assert final_score(objects) == final_score(columns) == recording.score
+    assert positions(objects) == positions(columns)
@@ -0,0 +1,40 @@
+from components import TransformComponent
+from components import RigidBodyComponent
+
+from ecs import System
+from ecs import World
+
+class ReadSystem(System):
+    reads = (TransformComponent, )
+
+    def __init__(self):
+        super().__init__()
+        self.runs = 0
+
+    def update(self, *args, **kwargs):
+        self.runs += 1
+
+class WriteSystem(ReadSystem):
+    reads  = ()
+    writes = (RigidBodyComponent, )
+
+def test_parallel_world_runs_every_system_and_shuts_down():
+    with World(workers=2) as world:
+        systems = [ReadSystem(), WriteSystem(), ReadSystem()]
+        for system in systems: world.add_system(system)
+
+        assert [len(stage) for stage in world.schedule()] == [3]
+
+        world.update()
+        assert [system.runs for system in systems] == [1, 1, 1]
+        assert set(world._scheduler.durations) == set(systems)
+
+        executor = world._scheduler.executor
+        fork     = world.fork()
+        fork.close()
+        assert fork._scheduler.executor is None
+
+    assert world._scheduler.executor is None and executor._shutdown
+
+    world.update()
+    assert [system.runs for system in systems] == [2, 2, 2]
@@ -0,0 +1,76 @@
+from components import TransformComponent
+from components import RigidBodyComponent
+from components import ScoreComponent
+
+from game import InputManager
+from game import build_world
+from game import DISPLAY
+
+from assets import AssetManager
+from snapshot import Snapshot
+from ecs import World
+
+import pygame as pg
+import numpy as np
+import subprocess
+import sys
+
+def build(columnar, assets, seed=3):
+    world = World(columnar=columnar)
+    build_world(world, pg.Surface(DISPLAY), assets, render=None, rng=np.random.RandomState(seed))
+    return world
+
+def run(world, start, frames):
+    inputs = InputManager()
+    for frame in range(start, start + frames):
+        inputs.set_flags(frame % 25 == 0)
+        world.step('simulation', dt=1 / 60, inputs=inputs)
+
+def state(world):
+    return (
+        sorted((entity, round(trans.pos.x, 6), round(trans.pos.y, 6), trans.rot) for entity, trans in world.get_component(TransformComponent)),
+        sorted((entity, round(rigid.vel.x, 6), round(rigid.vel.y, 6)) for entity, rigid in world.get_component(RigidBodyComponent)),
+        [score.value for entity, score in world.get_component(ScoreComponent)]
+    )
+
+def test_restore_replays_the_same_future(columnar):
+    assets = AssetManager()
+    world  = build(columnar, assets)
+    run(world, 0, 150)
+
+    snapshot = world.snapshot(assets)
+    run(world, 150, 300)
+    expected = state(world)
+
+    world.restore(snapshot, assets)
+    run(world, 150, 300)
+    assert state(world) == expected
+
+def test_saved_snapshot_restores_into_a_fresh_world(columnar, tmp_path):
+    assets = AssetManager()
+    world  = build(columnar, assets)
+    run(world, 0, 150)
+
+    world.snapshot(assets).save(tmp_path / 'world.snap')
+    run(world, 150, 300)
+
+    fresh = build(columnar, assets, seed=99)
+    fresh.restore(Snapshot.load(tmp_path / 'world.snap'), assets)
+    run(fresh, 150, 300)
+    assert state(fresh) == state(world)
+
+def test_fork_runs_independently(columnar):
+    world = build(columnar, AssetManager())
+    run(world, 0, 150)
+
+    fork   = world.fork()
+    before = state(world)
+    run(fork, 150, 300)
+
+    assert state(world) == before
+    run(world, 150, 300)
+    assert state(fork) == state(world)
+
+def test_ecs_loads_snapshot_lazily():
+    code = "import sys, ecs; sys.exit('pygame' in sys.modules or 'snapshot' in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', code]).returncode == 0